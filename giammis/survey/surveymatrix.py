@@ -1,13 +1,8 @@
 import numpy as np
-from scipy.cluster import hierarchy
 from random import randint
 import operator
 import itertools
 import string
-import matplotlib.pyplot as plt
-from matplotlib import colors
-from plotly import offline
-import plotly.graph_objs as go
 
 
 def create_survey_matrix(data, value_type='actual', grouping_cols=['name', 'macro area', 'micro area']):
@@ -131,6 +126,7 @@ class SurveyMatrix(object):
                             survey_title=self.survey_title)
 
     def sort_by_dendogram(self):
+        from scipy.cluster import hierarchy
         matrix = self.matrix
         Z = hierarchy.linkage(matrix)
         dn = hierarchy.dendrogram(Z)
@@ -151,7 +147,11 @@ class SurveyMatrix(object):
                     matrix[i][j] - matrix[i + 1][j]) + abs(matrix[i][j] - matrix[i + 1][j + 1])
         return total
 
-    def plot_heatmap(self, cmap=colors.ListedColormap(['red', 'yellow', 'green']), bounds_step=1):
+    def plot_heatmap(self, cmap=None, bounds_step=1):
+        import matplotlib.pyplot as plt
+        from matplotlib import colors
+        if cmap is None:
+            cmap = colors.ListedColormap(['red', 'yellow', 'green'])
         title = self.survey_title
         x, y, z = self.questions, self.users, self.matrix
         bounds_list = np.arange(self.min_value, self.max_value + 1, bounds_step)
@@ -181,6 +181,9 @@ class SurveyMatrix(object):
         plt.show()
 
     def plotly_heatmap(self, color_list=['red', 'yellow', 'green'], bounds_list=[0, 3, 6, 10]):
+        from matplotlib import colors
+        from plotly import offline
+        import plotly.graph_objs as go
         title = self.survey_title
         x, y, z = self.questions, self.users, self.matrix
 
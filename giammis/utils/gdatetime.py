@@ -1,15 +1,359 @@
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
 
+import numpy as np
 
-def sum_intervals(intervals):
+# Above this number of intervals, sum_intervals switches to the numpy engine
+NUMPY_ENGINE_THRESHOLD = 10000
+
+SECOND_NS = 10 ** 9
+DAY_NS = 24 * 60 * 60 * SECOND_NS
+NAT_NS = np.iinfo('int64').min
+# 1970-01-01, day 0 of the epoch, was a Thursday
+EPOCH_WEEKDAY = 3
+CALENDAR_UNITS = ('day', 'week', 'month', 'quarter', 'year', 'business_day')
+
+
+def _datetimes_to_ns(dates):
+    """Convert a collection of dates to nanoseconds since the epoch, tz-aware dates are taken in UTC.
+
+    Args:
+        dates (list|ndarray|Series|DatetimeIndex): the dates to convert
+
+    Returns:
+        ndarray: int64 array of nanoseconds
+    """
+    if isinstance(dates, np.ndarray) and np.issubdtype(dates.dtype, np.datetime64):
+        return dates.astype('datetime64[ns]').view('int64')
+    import pandas as pd
+    index = pd.DatetimeIndex(dates)
+    if index.tz is not None:
+        index = index.tz_convert(None)
+    return np.asarray(index, dtype='datetime64[ns]').view('int64')
+
+
+def _datetimes_to_wall_ns(dates, utc=False, ambiguous='raise', nonexistent='shift_forward'):
+    """Convert a collection of dates to wall-clock nanoseconds since the epoch, tz-aware dates are taken in their
+    own time zone (or in UTC, if requested).
+
+    The returned function builds back the same kind of input from an array of nanoseconds aligned with the input
+    dates, e.g. their buckets. Wall-clock results keep the UTC offset of their input date whenever it is valid for
+    them, so that buckets inside a DST fold stay on the same side of it; otherwise they are localized again with
+    the given ambiguous and nonexistent policies (as in pandas tz_localize).
+
+    Args:
+        dates (ndarray|Series|DatetimeIndex|list): the dates to convert
+        utc (bool): take tz-aware dates in UTC instead of their wall-clock time
+        ambiguous (str): 'raise' or 'NaT', for wall-clock results falling in a DST fold
+        nonexistent (str): 'shift_forward', 'shift_backward', 'NaT' or 'raise', for wall-clock results falling
+            in a DST gap
+
+    Returns:
+        tuple: (int64 array of nanoseconds, function building back from nanoseconds the same kind of input)
+    """
+    if isinstance(dates, np.ndarray) and np.issubdtype(dates.dtype, np.datetime64):
+        return dates.astype('datetime64[ns]').view('int64'), lambda ns: ns.view('datetime64[ns]')
+    import pandas as pd
+    index = pd.DatetimeIndex(dates)
+    tz = index.tz
+    utc_ns = None
+    if tz is not None:
+        utc_ns = np.asarray(index.tz_convert(None), dtype='datetime64[ns]').view('int64')
+        index = index.tz_localize(None)
+    wall_ns = np.asarray(index, dtype='datetime64[ns]').view('int64')
+
+    def rebuild(ns):
+        if tz is None:
+            result = pd.DatetimeIndex(ns.view('datetime64[ns]'), name=index.name)
+        else:
+            if not utc:
+                ns = _wall_ns_to_utc_ns(ns, tz, wall_ns - utc_ns, ambiguous, nonexistent)
+            result = pd.DatetimeIndex(ns.view('datetime64[ns]'), name=index.name).tz_localize('UTC').tz_convert(tz)
+        if isinstance(dates, pd.Series):
+            return pd.Series(result, index=dates.index, name=dates.name)
+        return result
+
+    return (utc_ns if utc and tz is not None else wall_ns), rebuild
+
+
+def _utc_ns_to_wall_ns(ns, tz):
+    import pandas as pd
+    index = pd.DatetimeIndex(ns.view('datetime64[ns]')).tz_localize('UTC').tz_convert(tz).tz_localize(None)
+    return np.asarray(index, dtype='datetime64[ns]').view('int64')
+
+
+def _wall_ns_to_utc_ns(ns, tz, offsets, ambiguous='raise', nonexistent='shift_forward'):
+    """
+    Args:
+        ns (ndarray): int64 array of wall-clock nanoseconds, NaT allowed
+        tz (tzinfo): the time zone of the wall-clock times
+        offsets (ndarray): int64 array of preferred UTC offsets, in nanoseconds, one for each wall-clock time
+        ambiguous (str): policy for the wall-clock times not valid with their preferred offset and ambiguous
+        nonexistent (str): policy for the wall-clock times not valid with their preferred offset and nonexistent
+
+    Returns:
+        ndarray: int64 array of UTC nanoseconds
+    """
+    import pandas as pd
+    nat = ns == NAT_NS
+    result = np.where(nat, NAT_NS, ns - offsets)
+    moved = ~nat & (_utc_ns_to_wall_ns(result, tz) != ns)
+    if moved.any():
+        localized = pd.DatetimeIndex(ns[moved].view('datetime64[ns]')).tz_localize(tz, ambiguous=ambiguous,
+                                                                                  nonexistent=nonexistent)
+        result[moved] = np.asarray(localized.tz_convert(None), dtype='datetime64[ns]').view('int64')
+    return result
+
+
+def _bucket_wall_ns(ns, round_to, rounding_func):
+    """Apply a rounding function on the seconds of the day, as done by floor_datetime and round_datetime.
+
+    Args:
+        ns (ndarray): int64 array of wall-clock nanoseconds, NaT allowed
+        round_to (float): time unit, the granularity for the rounding, in seconds
+        rounding_func (Callable): function of (seconds of the day, round_to) returning the rounded seconds
+
+    Returns:
+        ndarray: int64 array of nanoseconds, without the sub-second part
+    """
+    nat = ns == NAT_NS
+    ns_of_day = ns % DAY_NS
+    seconds = ns_of_day // SECOND_NS
+    rounding = rounding_func(seconds, round_to)
+    # Same microsecond resolution of timedelta(0, rounding - seconds, -date.microsecond)
+    result = ns - ns_of_day + np.round(rounding * 10 ** 6).astype('int64') * 1000
+    result[nat] = NAT_NS
+    return result
+
+
+def _merge_intervals_ns(starts, ends, groups=None):
+    """Merge overlapping (or touching) intervals with a sort plus a cumulative-max sweep.
+
+    When groups are given, the intervals are sorted by (group, start) and the sweep restarts at each group,
+    so that intervals of different groups are never merged together.
+
+    Args:
+        starts (ndarray): int64 array with the start of each interval
+        ends (ndarray): int64 array with the end of each interval
+        groups (ndarray|None): int array with the group code of each interval
+
+    Returns:
+        tuple: (starts, ends, groups) of the merged intervals, sorted and disjoint within each group
+    """
+    if len(starts) == 0:
+        return starts, ends, groups
+    if groups is None:
+        order = np.argsort(starts, kind='mergesort')
+    else:
+        order = np.lexsort((starts, groups))
+        groups = groups[order]
+    starts, ends = starts[order], ends[order]
+    new_block = np.empty(len(starts), dtype=bool)
+    new_block[0] = True
+    if groups is None:
+        reach = np.maximum.accumulate(ends)
+        np.greater(starts[1:], reach[:-1], out=new_block[1:])
+    else:
+        import pandas as pd
+        reach = pd.Series(ends).groupby(groups).cummax().values
+        new_block[1:] = (starts[1:] > reach[:-1]) | (groups[1:] != groups[:-1])
+    first = np.flatnonzero(new_block)
+    last = np.append(first[1:], len(starts)) - 1
+    return starts[first], reach[last], None if groups is None else groups[first]
+
+
+class IntervalSet(object):
+    """Set of disjoint date intervals, stored as sorted int64 arrays of nanoseconds since the epoch.
+
+    Intervals are half-open, [start, end). Empty, inverted and NaT intervals are dropped, overlapping or touching
+    intervals are merged once on creation, so that every following query (total length, containment,
+    set operations) works on the sorted arrays.
+    """
+
+    def __init__(self, start_dates=None, end_dates=None):
+        if start_dates is None or len(start_dates) == 0:
+            starts, ends = np.array([], dtype='int64'), np.array([], dtype='int64')
+        else:
+            if end_dates is None or len(start_dates) != len(end_dates):
+                raise ValueError("Start and end dates must be given with the same length")
+            starts, ends = _datetimes_to_ns(start_dates), _datetimes_to_ns(end_dates)
+            # Empty, inverted and missing (NaT) intervals are dropped
+            valid = (starts != NAT_NS) & (ends != NAT_NS) & (ends > starts)
+            starts, ends, _ = _merge_intervals_ns(starts[valid], ends[valid])
+        self.starts = starts
+        self.ends = ends
+
+    @classmethod
+    def from_intervals(cls, intervals):
+        """
+        Args:
+            intervals (list[tuple]): list of tuples, where each tuple contains (start_date, end_date)
+
+        Returns:
+            IntervalSet:
+        """
+        return cls([interval[0] for interval in intervals], [interval[1] for interval in intervals])
+
+    @classmethod
+    def _from_merged_ns(cls, starts, ends):
+        interval_set = cls()
+        interval_set.starts, interval_set.ends = starts, ends
+        return interval_set
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        starts, ends = self.to_numpy()
+        return iter(zip(starts, ends))
+
+    def __eq__(self, other):
+        return (isinstance(other, IntervalSet)
+                and np.array_equal(self.starts, other.starts)
+                and np.array_equal(self.ends, other.ends))
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "IntervalSet({} intervals, {} seconds)".format(len(self), self.total_seconds())
+
+    def __contains__(self, date):
+        return bool(self.contains([date])[0])
+
+    def __or__(self, other):
+        return self.union(other)
+
+    def __and__(self, other):
+        return self.intersection(other)
+
+    def __sub__(self, other):
+        return self.difference(other)
+
+    def to_numpy(self):
+        """
+        Returns:
+            tuple: (starts, ends) of the merged intervals, as datetime64[ns] arrays
+        """
+        return self.starts.view('datetime64[ns]'), self.ends.view('datetime64[ns]')
+
+    def total_seconds(self):
+        """
+        Returns:
+            float: total length of the intervals, in seconds
+        """
+        return int((self.ends - self.starts).sum()) / 10 ** 9
+
+    def locate(self, dates):
+        """Find, with a binary search, the interval containing each of the given dates.
+
+        Args:
+            dates (list|ndarray|Series): the dates to look for
+
+        Returns:
+            ndarray: index of the interval containing each date, -1 if the date is not covered
+        """
+        return self._locate_ns(_datetimes_to_ns(dates))
+
+    def contains(self, dates):
+        """
+        Args:
+            dates (list|ndarray|Series): the dates to look for
+
+        Returns:
+            ndarray: boolean array, true where the date is covered by one of the intervals
+        """
+        return self.locate(dates) >= 0
+
+    def union(self, other):
+        """
+        Args:
+            other (IntervalSet):
+
+        Returns:
+            IntervalSet: the dates covered by at least one of the two sets
+        """
+        return self._combine(other, np.logical_or)
+
+    def intersection(self, other):
+        """
+        Args:
+            other (IntervalSet):
+
+        Returns:
+            IntervalSet: the dates covered by both sets
+        """
+        return self._combine(other, np.logical_and)
+
+    def difference(self, other):
+        """
+        Args:
+            other (IntervalSet):
+
+        Returns:
+            IntervalSet: the dates covered by this set and not by the other one
+        """
+        return self._combine(other, lambda mine, theirs: mine & ~theirs)
+
+    def _locate_ns(self, points):
+        index = np.searchsorted(self.starts, points, side='right') - 1
+        covered = index >= 0
+        covered[covered] = points[covered] < self.ends[index[covered]]
+        return np.where(covered, index, -1)
+
+    def _combine(self, other, operation):
+        # Every boundary of the two sets splits the time line in elementary segments, each one entirely
+        # inside or outside each set: keep the segments selected by the operation and merge them back
+        bounds = np.unique(np.concatenate([self.starts, self.ends, other.starts, other.ends]))
+        if len(bounds) < 2:
+            return IntervalSet()
+        lefts, rights = bounds[:-1], bounds[1:]
+        selected = operation(self._locate_ns(lefts) >= 0, other._locate_ns(lefts) >= 0)
+        starts, ends, _ = _merge_intervals_ns(lefts[selected], rights[selected])
+        return IntervalSet._from_merged_ns(starts, ends)
+
+
+def sum_intervals(intervals=None, start_dates=None, end_dates=None, engine='auto'):
     """Compute the total sum of the given date intervals, handling in the proper way overlapping intervals.
 
+    The intervals can be given either as a list of (start_date, end_date) tuples, or as two aligned arrays
+    of start and end dates (datetime64 arrays or pandas Series). The 'numpy' engine builds an IntervalSet,
+    merging the intervals with a sort plus a cumulative-max sweep, and it is used by default for arrays and
+    for long lists. Build the IntervalSet directly to run more queries on the same intervals.
+
     Args:
-        intervals (list[tuple]): list of tuples, where each tuple contains (start_date, end_date)
+        intervals (iterable[tuple]|None): list or other iterable of tuples, where each tuple contains
+            (start_date, end_date)
+        start_dates (list|ndarray|Series|None): the start of each interval, alternative to intervals
+        end_dates (list|ndarray|Series|None): the end of each interval, alternative to intervals
+        engine (str): one of 'auto', 'python' or 'numpy'
 
     Returns:
         float: total sum of the given intervals, in seconds
     """
+    if engine not in ('auto', 'python', 'numpy'):
+        raise ValueError("Engine '{}' not supported".format(engine))
+
+    if intervals is None:
+        if start_dates is None or end_dates is None:
+            raise ValueError("Either intervals or both start_dates and end_dates must be given")
+        if len(start_dates) != len(end_dates):
+            raise ValueError("Start and end dates have different lengths: {} and {}".format(len(start_dates),
+                                                                                         len(end_dates)))
+        if engine == 'python':
+            intervals = list(zip(start_dates, end_dates))
+    elif engine != 'python':
+        if not hasattr(intervals, '__len__'):
+            # Generators and other one-shot iterables are consumed once, here
+            intervals = list(intervals)
+        if engine == 'numpy' or len(intervals) > NUMPY_ENGINE_THRESHOLD:
+            start_dates = [interval[0] for interval in intervals]
+            end_dates = [interval[1] for interval in intervals]
+            intervals = None
+
+    if intervals is None:
+        return IntervalSet(start_dates, end_dates).total_seconds()
+
     start, end = 0, 1
     times = []
     for interval in intervals:
@@ -32,6 +376,201 @@ def sum_intervals(intervals):
     return result.total_seconds()
 
 
+class IntervalAccumulator(object):
+    """Streaming version of sum_intervals, for intervals arriving over time.
+
+    Intervals can arrive out of order, as long as each start is no older than the latest start seen so far
+    minus the allowed lateness. The merged intervals that can still be touched by a future arrival are kept
+    in sorted lists (the frontier), each arrival is placed with a binary search and merged with its
+    neighbours; the intervals falling behind the lateness window are closed and only their total is kept.
+    """
+
+    def __init__(self, lateness=timedelta(0)):
+        self.lateness = lateness
+        self.watermark = None
+        self._starts = []
+        self._ends = []
+        self._open_total = timedelta()
+        self._closed_total = timedelta()
+
+    def add(self, start_date, end_date):
+        """
+        Args:
+            start_date (datetime): the start of the new interval
+            end_date (datetime): the end of the new interval
+
+        Returns:
+            IntervalAccumulator: self, so that calls can be chained
+        """
+        if self.watermark is not None and start_date < self.watermark - self.lateness:
+            raise ValueError("Interval starting at {} is later than the allowed lateness ({} from {})".format(
+                start_date, self.lateness, self.watermark))
+        if self.watermark is None or start_date > self.watermark:
+            self.watermark = start_date
+        if end_date > start_date:
+            # Frontier intervals overlapping or touching the new one are in [first, last)
+            first = bisect_left(self._ends, start_date)
+            last = bisect_right(self._starts, end_date)
+            if first < last:
+                start_date = min(start_date, self._starts[first])
+                end_date = max(end_date, self._ends[last - 1])
+                for i in range(first, last):
+                    self._open_total -= self._ends[i] - self._starts[i]
+            self._starts[first:last] = [start_date]
+            self._ends[first:last] = [end_date]
+            self._open_total += end_date - start_date
+        self._close()
+        return self
+
+    def extend(self, intervals):
+        """
+        Args:
+            intervals (list[tuple]): list of tuples, where each tuple contains (start_date, end_date)
+
+        Returns:
+            IntervalAccumulator: self, so that calls can be chained
+        """
+        for start_date, end_date in intervals:
+            self.add(start_date, end_date)
+        return self
+
+    def open_intervals(self):
+        """
+        Returns:
+            list[tuple]: the merged intervals still in the frontier, as (start_date, end_date) tuples
+        """
+        return list(zip(self._starts, self._ends))
+
+    def total_seconds(self):
+        """
+        Returns:
+            float: total sum of the intervals added so far, in seconds
+        """
+        return (self._closed_total + self._open_total).total_seconds()
+
+    def _close(self):
+        n_closed = bisect_left(self._ends, self.watermark - self.lateness)
+        if n_closed:
+            for i in range(n_closed):
+                length = self._ends[i] - self._starts[i]
+                self._open_total -= length
+                self._closed_total += length
+            del self._starts[:n_closed]
+            del self._ends[:n_closed]
+
+
+def sum_intervals_by(df, subject_col, start_col, end_col):
+    """Compute the total sum of the date intervals of each subject, in a single pass over the whole DataFrame.
+
+    Equivalent to applying sum_intervals to each group of a groupby on the subject column, but the intervals
+    are sorted once by (subject, start) and merged with a segmented sweep.
+
+    Args:
+        df (DataFrame): one row per interval
+        subject_col (str): column identifying the subject of each interval
+        start_col (str): column with the start date of each interval
+        end_col (str): column with the end date of each interval
+
+    Returns:
+        Series: total sum of the intervals of each subject, in seconds, indexed by subject
+    """
+    import pandas as pd
+    codes, subjects = pd.factorize(df[subject_col], sort=True)
+    starts = _datetimes_to_ns(df[start_col])
+    ends = _datetimes_to_ns(df[end_col])
+    # Same intervals as sum_intervals: empty, inverted and NaT intervals are dropped, as rows without subject
+    valid = (codes >= 0) & (starts != NAT_NS) & (ends != NAT_NS) & (ends > starts)
+    starts, ends, groups = _merge_intervals_ns(starts[valid], ends[valid], codes[valid])
+    totals = np.zeros(len(subjects), dtype='int64')
+    if groups is not None:
+        np.add.at(totals, groups, ends - starts)
+    return pd.Series(totals / 10 ** 9, index=pd.Index(subjects, name=subject_col), name='seconds')
+
+
+class DatetimeRange(object):
+    """Lazy sequence of the dates start_date, start_date + delta, ... before end_date, like range for integers.
+
+    Length, indexing, slicing, containment and index lookups are computed arithmetically from the start and the
+    delta, so that no bin is ever materialised unless to_numpy is called.
+    """
+
+    def __init__(self, start_date, end_date, delta):
+        if delta <= timedelta(0):
+            raise ValueError("Delta must be positive, got {}".format(delta))
+        self.start_date = start_date
+        self.end_date = end_date
+        self.delta = delta
+        self._length = max(0, -((start_date - end_date) // delta))
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield self.start_date + i * self.delta
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self._length)
+            if step < 0:
+                return [self[i] for i in range(start, stop, step)]
+            length = len(range(start, stop, step))
+            first = self.start_date + start * self.delta
+            return DatetimeRange(first, first + length * step * self.delta, step * self.delta)
+        if item < 0:
+            item += self._length
+        if not 0 <= item < self._length:
+            raise IndexError("DatetimeRange index out of range")
+        return self.start_date + item * self.delta
+
+    def __contains__(self, date):
+        try:
+            offset = date - self.start_date
+        except TypeError:
+            return False
+        return offset >= timedelta(0) and date < self.end_date and offset % self.delta == timedelta(0)
+
+    def __eq__(self, other):
+        if isinstance(other, DatetimeRange):
+            return (len(self) == len(other)
+                    and (len(self) == 0 or self.start_date == other.start_date)
+                    and (len(self) < 2 or self.delta == other.delta))
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __repr__(self):
+        return "DatetimeRange({!r}, {!r}, {!r})".format(self.start_date, self.end_date, self.delta)
+
+    def index(self, date):
+        """
+        Args:
+            date (datetime): one of the dates in the range
+
+        Returns:
+            int: the position of the date in the range
+        """
+        if date not in self:
+            raise ValueError("{} is not in range".format(date))
+        return (date - self.start_date) // self.delta
+
+    def to_numpy(self):
+        """Materialise the range with np.arange, tz-aware dates are taken in their own wall-clock time.
+
+        Returns:
+            ndarray: datetime64[ns] array with all the dates in the range
+        """
+        import pandas as pd
+        start, _ = _datetimes_to_wall_ns([self.start_date])
+        start = start.view('datetime64[ns]')[0]
+        delta = np.timedelta64(pd.Timedelta(self.delta).value, 'ns')
+        return np.arange(start, start + self._length * delta, delta)
+
+
 def xrange_datetime(start_date, end_date, delta):
     """
 
@@ -49,17 +588,20 @@ def xrange_datetime(start_date, end_date, delta):
         curr += delta
 
 
-def range_datetime(start_date, end_date, delta):
+def range_datetime(start_date, end_date, delta, lazy=False):
     """
 
     Args:
         start_date (datetime): the start of the time period to bin
         end_date (datetime): the end of the time period to bin
         delta (timedelta): the delta between each time bin
+        lazy (bool): return a DatetimeRange instead of building the list
 
     Returns:
-        list:
+        list|DatetimeRange:
     """
+    if lazy:
+        return DatetimeRange(start_date, end_date, delta)
     curr = start_date
     result = []
     while curr < end_date:
@@ -98,6 +640,48 @@ def floor_datetime(date, round_to=60 * 60):
     return date + timedelta(0, rounding - seconds, -date.microsecond)
 
 
+def round_datetime_array(dates, round_to=60 * 60, utc=False, ambiguous='raise', nonexistent='shift_forward'):
+    """Vectorized round_datetime, computed with integer arithmetic on the nanoseconds of the whole array.
+
+    Tz-aware dates are rounded on their wall-clock time and converted back keeping their UTC offset when valid,
+    so that results are correct around DST gaps and folds; with utc=True they are rounded on UTC time instead.
+
+    Args:
+        dates (ndarray|Series|DatetimeIndex): datetime64 array, or pandas dates, possibly tz-aware
+        round_to (int): time unit, the granularity for the rounding, in seconds
+        utc (bool): round tz-aware dates on UTC time
+        ambiguous (str): 'raise' or 'NaT', for rounded wall-clock times ambiguous in a DST fold
+        nonexistent (str): 'shift_forward', 'shift_backward', 'NaT' or 'raise', for rounded wall-clock times
+            falling in a DST gap
+
+    Returns:
+        ndarray|Series|DatetimeIndex: the rounded dates, of the same kind of the input
+    """
+    ns, rebuild = _datetimes_to_wall_ns(dates, utc, ambiguous, nonexistent)
+    return rebuild(_bucket_wall_ns(ns, round_to, lambda seconds, r: (seconds + r / 2) // r * r))
+
+
+def floor_datetime_array(dates, round_to=60 * 60, utc=False, ambiguous='raise', nonexistent='shift_forward'):
+    """Vectorized floor_datetime, computed with integer arithmetic on the nanoseconds of the whole array.
+
+    Tz-aware dates are floored on their wall-clock time and converted back keeping their UTC offset when valid,
+    so that results are correct around DST gaps and folds; with utc=True they are floored on UTC time instead.
+
+    Args:
+        dates (ndarray|Series|DatetimeIndex): datetime64 array, or pandas dates, possibly tz-aware
+        round_to (float): time unit, the granularity for the flooring, in seconds
+        utc (bool): floor tz-aware dates on UTC time
+        ambiguous (str): 'raise' or 'NaT', for floored wall-clock times ambiguous in a DST fold
+        nonexistent (str): 'shift_forward', 'shift_backward', 'NaT' or 'raise', for floored wall-clock times
+            falling in a DST gap
+
+    Returns:
+        ndarray|Series|DatetimeIndex: the floored dates, of the same kind of the input
+    """
+    ns, rebuild = _datetimes_to_wall_ns(dates, utc, ambiguous, nonexistent)
+    return rebuild(_bucket_wall_ns(ns, round_to, lambda seconds, r: seconds // r * r))
+
+
 def time_units_touched(start_date, duration_seconds, delta_seconds):
     """
 
@@ -116,3 +700,234 @@ def time_units_touched(start_date, duration_seconds, delta_seconds):
     if last_unit != end_date:
         result.append(last_unit)
     return result
+
+
+def time_units_touched_array(start_dates, duration_seconds, delta_seconds, as_frame=False):
+    """Vectorized time_units_touched, exploding all the events in their time units at once.
+
+    Args:
+        start_dates (ndarray|Series|DatetimeIndex): start of each event, tz-aware dates are taken in wall time
+        duration_seconds (int|ndarray): event durations, in seconds, one for each event or the same for all
+        delta_seconds (float): time granularity, in seconds
+        as_frame (bool): return a DataFrame with 'event_index' and 'time_unit' columns
+
+    Returns:
+        tuple|DataFrame: (event_index, time_unit) arrays, with one entry for each time unit touched by each event,
+            ordered by event and then by time; time_unit is a datetime64[ns] array
+    """
+    start_ns, _ = _datetimes_to_wall_ns(start_dates)
+    duration_ns = np.round(np.asarray(duration_seconds, dtype='float64') * 10 ** 6).astype('int64') * 1000
+    delta_ns = int(round(delta_seconds * 10 ** 6)) * 1000
+    valid = start_ns != NAT_NS
+
+    first_unit = _bucket_wall_ns(start_ns, delta_seconds, lambda seconds, r: seconds // r * r)
+    end_ns = start_ns + duration_ns
+    last_unit = _bucket_wall_ns(end_ns, delta_seconds, lambda seconds, r: seconds // r * r)
+    # Units from range_datetime(first_unit, last_unit), plus the last unit if the event does not end on its edge
+    in_range = np.where(valid & (last_unit > first_unit), -((first_unit - last_unit) // delta_ns), 0)
+    counts = in_range + (valid & (last_unit != end_ns))
+
+    event_index = np.repeat(np.arange(len(start_ns)), counts)
+    position = np.arange(len(event_index)) - np.repeat(np.cumsum(counts) - counts, counts)
+    time_unit = np.where(position < in_range[event_index],
+                         first_unit[event_index] + position * delta_ns,
+                         last_unit[event_index]).view('datetime64[ns]')
+    if as_frame:
+        import pandas as pd
+        return pd.DataFrame({'event_index': event_index, 'time_unit': time_unit})
+    return event_index, time_unit
+
+
+def _wall_grid_to_utc_ns(ns, tz):
+    """
+    Args:
+        ns (ndarray): int64 array of wall-clock nanoseconds, sorted
+        tz (tzinfo): the time zone of the wall-clock times
+
+    Returns:
+        ndarray: int64 array of the sorted UTC nanoseconds of the wall-clock times, with both the instants of
+            the times in a DST fold, and the times in a DST gap shifted forward
+    """
+    import pandas as pd
+    index = pd.DatetimeIndex(ns.view('datetime64[ns]'))
+    both = [index.tz_localize(tz, ambiguous=np.full(len(ns), dst), nonexistent='shift_forward').tz_convert(None)
+            for dst in (True, False)]
+    return np.unique(np.asarray(both[0].append(both[1]), dtype='datetime64[ns]').view('int64'))
+
+
+def covered_seconds_per_time_unit(start_dates, end_dates, delta_seconds, union=True):
+    """Compute how many seconds of each time unit are covered by the given intervals, without exploding them.
+
+    The time units start from the floor_datetime of the earliest start and have a fixed width in wall time. Each
+    interval adds +1 to a difference array of fully covered units and corrects the two partially covered ones at
+    its edges, so that the cost is linear in the number of intervals plus the number of time units, whatever the
+    durations. The intervals are measured in elapsed time: with tz-aware dates, units across a DST change last
+    more or less than delta_seconds, and both the wall times repeated in a DST fold get their own unit.
+
+    Args:
+        start_dates (ndarray|Series|DatetimeIndex): the start of each interval
+        end_dates (ndarray|Series|DatetimeIndex): the end of each interval
+        delta_seconds (float): time granularity, in seconds
+        union (bool): merge overlapping intervals first, as sum_intervals does, instead of a raw sum
+
+    Returns:
+        tuple: (time_unit, seconds), datetime64[ns] array (tz-aware DatetimeIndex for tz-aware dates) with the
+            start of each time unit and float array with the covered seconds of each of them
+    """
+    tz = None
+    if not (isinstance(start_dates, np.ndarray) and np.issubdtype(start_dates.dtype, np.datetime64)):
+        import pandas as pd
+        tz = pd.DatetimeIndex(start_dates).tz
+    starts, ends = _datetimes_to_ns(start_dates), _datetimes_to_ns(end_dates)
+    valid = (starts != NAT_NS) & (ends != NAT_NS) & (ends > starts)
+    starts, ends = starts[valid], ends[valid]
+    if union:
+        starts, ends, _ = _merge_intervals_ns(starts, ends)
+    if len(starts) == 0:
+        time_unit = np.array([], dtype='datetime64[ns]')
+        if tz is not None:
+            time_unit = pd.DatetimeIndex(time_unit).tz_localize('UTC').tz_convert(tz)
+        return time_unit, np.array([], dtype='float64')
+
+    # Unit edges on the wall-clock grid, in elapsed time
+    delta_ns = int(round(delta_seconds * 10 ** 6)) * 1000
+    wall_bounds = np.array([starts.min(), ends.max()])
+    if tz is not None:
+        wall_bounds = _utc_ns_to_wall_ns(wall_bounds, tz)
+    origin = _bucket_wall_ns(wall_bounds[:1], delta_seconds, lambda seconds, r: seconds // r * r)[0]
+    edges = origin + np.arange((wall_bounds[1] - origin) // delta_ns + 2) * delta_ns
+    if tz is not None:
+        edges = _wall_grid_to_utc_ns(edges, tz)
+    n_units = len(edges) - 1
+    first_unit = np.searchsorted(edges, starts, side='right') - 1
+    last_unit = np.searchsorted(edges, ends, side='right') - 1
+
+    fully_covered = np.cumsum(np.bincount(first_unit, minlength=n_units + 1)
+                              - np.bincount(last_unit, minlength=n_units + 1))
+    corrections = np.zeros(n_units + 1, dtype='int64')
+    np.add.at(corrections, last_unit, ends - edges[last_unit])
+    np.subtract.at(corrections, first_unit, starts - edges[first_unit])
+    covered_ns = fully_covered[:n_units] * np.diff(edges) + corrections[:n_units]
+
+    # Drop the trailing units after the last end, added to close the wall-clock grid
+    n_units = np.searchsorted(edges, ends.max(), side='left')
+    time_unit = edges[:n_units].view('datetime64[ns]')
+    if tz is not None:
+        time_unit = pd.DatetimeIndex(time_unit).tz_localize('UTC').tz_convert(tz)
+    return time_unit, covered_ns[:n_units] / 10 ** 9
+
+
+def _floor_calendar_ns(ns, unit, week_start=0, calendar=None):
+    """
+    Args:
+        ns (ndarray): int64 array of wall-clock nanoseconds, NaT allowed
+        unit (str): one of CALENDAR_UNITS
+        week_start (int): first day of the week for the 'week' unit, 0 is Monday (ISO weeks) and 6 is Sunday
+        calendar (busdaycalendar|None): business days calendar for the 'business_day' unit
+
+    Returns:
+        ndarray: int64 array of nanoseconds, the start of the calendar unit of each date
+    """
+    if unit not in CALENDAR_UNITS:
+        raise ValueError("Calendar unit '{}' not supported, use one of {}".format(unit, CALENDAR_UNITS))
+    nat = ns == NAT_NS
+    days = np.where(nat, 0, ns // DAY_NS)
+    if unit in ('month', 'quarter', 'year', 'business_day') and len(days):
+        # Calendar conversions are much slower than a lookup: compute them once per day of the covered period
+        first_day, last_day = days.min(), days.max()
+        if last_day - first_day < len(days):
+            table = _floor_calendar_days(np.arange(first_day, last_day + 1), unit, week_start, calendar)
+            result_days = table[days - first_day]
+        else:
+            result_days = _floor_calendar_days(days, unit, week_start, calendar)
+    else:
+        result_days = _floor_calendar_days(days, unit, week_start, calendar)
+    result = result_days * DAY_NS
+    result[nat] = NAT_NS
+    return result
+
+
+def _floor_calendar_days(days, unit, week_start, calendar):
+    dates = days.view('datetime64[D]')
+    if unit == 'day':
+        return days
+    elif unit == 'week':
+        return days - (days + EPOCH_WEEKDAY - week_start) % 7
+    elif unit == 'month':
+        result = dates.astype('datetime64[M]')
+    elif unit == 'quarter':
+        months = dates.astype('datetime64[M]').view('int64')
+        result = (months - months % 3).view('datetime64[M]')
+    elif unit == 'year':
+        result = dates.astype('datetime64[Y]')
+    else:
+        result = np.busday_offset(dates, 0, roll='backward', busdaycal=calendar)
+    return result.astype('datetime64[D]').view('int64')
+
+
+def _business_day_calendar(holidays, weekmask):
+    import pandas as pd
+    if holidays is None:
+        holidays = []
+    holidays = np.asarray(pd.DatetimeIndex(holidays).values, dtype='datetime64[D]')
+    return np.busdaycalendar(weekmask=weekmask, holidays=holidays)
+
+
+def floor_datetime_calendar(dates, unit='month', week_start=0, holidays=None, weekmask='1111100', utc=False,
+                            ambiguous='raise', nonexistent='shift_forward'):
+    """Vectorized flooring of dates to calendar units, computed with integer calendar arithmetic on datetime64.
+
+    Args:
+        dates (ndarray|Series|DatetimeIndex): datetime64 array, or pandas dates, possibly tz-aware
+        unit (str): one of 'day', 'week', 'month', 'quarter', 'year' or 'business_day'
+        week_start (int): first day of the week for the 'week' unit, 0 is Monday (ISO weeks) and 6 is Sunday
+        holidays (list|None): dates that are not business days, for the 'business_day' unit
+        weekmask (str): business days of the week, from Monday to Sunday, for the 'business_day' unit
+        utc (bool): floor tz-aware dates on UTC time instead of their wall-clock time
+        ambiguous (str): 'raise' or 'NaT', for floored wall-clock times ambiguous in a DST fold
+        nonexistent (str): 'shift_forward', 'shift_backward', 'NaT' or 'raise', for floored wall-clock times
+            falling in a DST gap
+
+    Returns:
+        ndarray|Series|DatetimeIndex: the start of the calendar unit of each date, of the same kind of the input;
+            for 'business_day' it is the date itself or the previous business day
+    """
+    ns, rebuild = _datetimes_to_wall_ns(dates, utc, ambiguous, nonexistent)
+    calendar = _business_day_calendar(holidays, weekmask) if unit == 'business_day' else None
+    return rebuild(_floor_calendar_ns(ns, unit, week_start, calendar))
+
+
+def range_datetime_calendar(start_date, end_date, unit='month', week_start=0, holidays=None, weekmask='1111100'):
+    """Calendar version of range_datetime: the start of every calendar unit touched by [start_date, end_date).
+
+    Args:
+        start_date (datetime): the start of the time period to bin
+        end_date (datetime): the end of the time period to bin
+        unit (str): one of 'day', 'week', 'month', 'quarter', 'year' or 'business_day'
+        week_start (int): first day of the week for the 'week' unit, 0 is Monday (ISO weeks) and 6 is Sunday
+        holidays (list|None): dates that are not business days, for the 'business_day' unit
+        weekmask (str): business days of the week, from Monday to Sunday, for the 'business_day' unit
+
+    Returns:
+        ndarray: datetime64[ns] array, starting from the calendar unit of start_date
+    """
+    bounds, _ = _datetimes_to_wall_ns([start_date, end_date])
+    calendar = _business_day_calendar(holidays, weekmask) if unit == 'business_day' else None
+    first = _floor_calendar_ns(bounds[:1], unit, week_start, calendar).view('datetime64[ns]')[0]
+    end = bounds[1:].view('datetime64[ns]')[0]
+    if end <= first:
+        return np.array([], dtype='datetime64[ns]')
+    if unit in ('day', 'business_day'):
+        result = np.arange(first.astype('datetime64[D]'), end.astype('datetime64[D]') + 1)
+        if unit == 'business_day':
+            result = result[np.is_busday(result, busdaycal=calendar)]
+    elif unit == 'week':
+        result = np.arange(first.astype('datetime64[D]'), end.astype('datetime64[D]') + 1, 7)
+    elif unit == 'quarter':
+        result = np.arange(first.astype('datetime64[M]'), end.astype('datetime64[M]') + 1, 3)
+    else:
+        numpy_unit = 'datetime64[M]' if unit == 'month' else 'datetime64[Y]'
+        result = np.arange(first.astype(numpy_unit), end.astype(numpy_unit) + 1)
+    result = result.astype('datetime64[ns]')
+    return result[result < end]
+
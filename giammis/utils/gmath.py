@@ -1,7 +1,11 @@
 import numpy as np
-import itertools
 import math
-from scipy.spatial.distance import euclidean
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+EARTH_RADIUS_KM = 6367
+# Bits for each coordinate of the grid cells packed in an int64 cell id
+GRID_BITS = 21
 
 
 def haversine(lon1, lat1, lon2, lat2):
@@ -25,10 +29,86 @@ def haversine(lon1, lat1, lon2, lat2):
     dlat = lat2 - lat1
     a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
     c = 2 * math.asin(math.sqrt(a))
-    km = 6367 * c
+    km = EARTH_RADIUS_KM * c
     return km
 
 
+def _chunk_rows(n_cols, itemsize, max_memory_mb, n_temporaries=4):
+    """Number of rows of a (rows, n_cols) block such that its temporaries stay in the memory budget."""
+    return max(1, int(max_memory_mb * 2 ** 20 // (max(n_cols, 1) * itemsize * n_temporaries)))
+
+
+def _haversine_radians(lon1, lat1, lon2, lat2, cos_lat1, cos_lat2):
+    a = np.sin((lat2 - lat1) / 2) ** 2 + cos_lat1 * cos_lat2 * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1)))
+
+
+def haversine_array(lon1, lat1, lon2, lat2, pairwise=False, dtype=np.float64, max_memory_mb=256):
+    """
+    Vectorized version of haversine, for arrays of points.
+
+    Parameters
+    ----------
+    lon1, lat1 : array-like, longitudes and latitudes of the first points
+    lon2, lat2 : array-like, longitudes and latitudes of the second points
+    pairwise : default False. If false the distances are computed element-wise, broadcasting
+        the two sets of points (so a single point can be compared with many); if true the full
+        (n1, n2) matrix of distances between every first and every second point is computed,
+        in blocks of rows
+    dtype : default float64, float32 halves memory at the cost of precision
+    max_memory_mb : default 256, memory budget for the temporaries of each block of rows
+
+    Returns
+    -------
+    km : ndarray, the distances expressed in kilometers
+    """
+    lon1, lat1, lon2, lat2 = [np.radians(np.asarray(x, dtype=dtype)) for x in [lon1, lat1, lon2, lat2]]
+    if not pairwise:
+        return _haversine_radians(lon1, lat1, lon2, lat2, np.cos(lat1), np.cos(lat2)).astype(dtype, copy=False)
+    lon1, lat1, lon2, lat2 = lon1.ravel(), lat1.ravel(), lon2.ravel(), lat2.ravel()
+    cos_lat1, cos_lat2 = np.cos(lat1), np.cos(lat2)
+    km = np.empty((len(lon1), len(lon2)), dtype=dtype)
+    rows = _chunk_rows(len(lon2), km.itemsize, max_memory_mb)
+    for i in range(0, len(lon1), rows):
+        block = slice(i, i + rows)
+        km[block] = _haversine_radians(lon1[block, None], lat1[block, None], lon2, lat2,
+                                       cos_lat1[block, None], cos_lat2)
+    return km
+
+
+def nearest_haversine(lon, lat, ref_lon, ref_lat, dtype=np.float64, max_memory_mb=256):
+    """
+    For each point, find the closest reference point in terms of haversine distance.
+    The pairwise distances are computed in blocks of rows, never materialising the full matrix.
+
+    Parameters
+    ----------
+    lon, lat : array-like, longitudes and latitudes of the points
+    ref_lon, ref_lat : array-like, longitudes and latitudes of the reference points (e.g. depots)
+    dtype : default float64, float32 halves memory at the cost of precision
+    max_memory_mb : default 256, memory budget for the temporaries of each block of rows
+
+    Returns
+    -------
+    indices : ndarray, for each point the index of the closest reference point
+    km : ndarray, for each point the distance from the closest reference point, in kilometers
+    """
+    lon, lat = np.asarray(lon, dtype=dtype).ravel(), np.asarray(lat, dtype=dtype).ravel()
+    ref_lon, ref_lat = np.asarray(ref_lon, dtype=dtype).ravel(), np.asarray(ref_lat, dtype=dtype).ravel()
+    if len(ref_lon) == 0:
+        raise ValueError("No reference points given")
+    indices = np.empty(len(lon), dtype=np.intp)
+    km = np.empty(len(lon), dtype=dtype)
+    rows = _chunk_rows(len(ref_lon), np.dtype(dtype).itemsize, max_memory_mb)
+    for i in range(0, len(lon), rows):
+        block = slice(i, i + rows)
+        distances = haversine_array(lon[block], lat[block], ref_lon, ref_lat, pairwise=True, dtype=dtype,
+                                    max_memory_mb=max_memory_mb)
+        indices[block] = np.argmin(distances, axis=1)
+        km[block] = distances[np.arange(len(distances)), indices[block]]
+    return indices, km
+
+
 def manhattan_distance(cell1, cell2):
     """
     Parameters
@@ -46,18 +126,130 @@ def manhattan_distance(cell1, cell2):
     return hor_steps + ver_steps
 
 
-def no_points_close_to_me(me, points, radius=100):
+def _grid_distance_block(dx, dy, metric):
+    if metric == 'manhattan':
+        return np.add(dx, dy, out=dx)
+    if metric == 'chebyshev':
+        return np.maximum(dx, dy, out=dx)
+    return np.hypot(dx, dy, out=dx)
+
+
+def grid_distance(cells1, cells2, pairwise=False, metric='manhattan', dtype=None, max_memory_mb=256):
+    """
+    Array version of manhattan_distance, with the Chebyshev and euclidean distances as alternatives.
+
+    Parameters
+    ----------
+    cells1 : array-like of shape (n, 2), or a single cell, the first cells in a 2-dimensional grid
+    cells2 : array-like of shape (m, 2), or a single cell, the second cells in a 2-dimensional grid
+    pairwise : default False. If false the distances are computed element-wise, broadcasting
+        the two sets of cells (so a single cell can be compared with many, one-to-many); if true
+        the full (n, m) matrix between every first and every second cell is computed, in blocks of rows
+    metric : default 'manhattan', one of 'manhattan', 'chebyshev' or 'euclidean'
+    dtype : default None, the output dtype, e.g. int16 or int32 to save memory; the default is
+        the dtype of the cells (float64 for the euclidean metric). Integer dtypes must be able to
+        hold the distances
+    max_memory_mb : default 256, memory budget for the temporaries of each block of rows
+
+    Returns
+    -------
+    distance : ndarray, the number of steps (or the length) to get from the first cells to the second ones
+    """
+    if metric not in ('manhattan', 'chebyshev', 'euclidean'):
+        raise ValueError("Metric '{}' not supported".format(metric))
+    cells1, cells2 = np.asarray(cells1), np.asarray(cells2)
+    if dtype is None:
+        dtype = np.float64 if metric == 'euclidean' else np.result_type(cells1, cells2)
+    # Coordinates are subtracted in a signed 64 bits dtype, unsigned cells would wrap around and narrow output
+    # dtypes would truncate them: the output dtype is only applied to the distances
+    integer_cells = np.issubdtype(np.result_type(cells1, cells2), np.integer)
+    work_dtype = np.int64 if metric != 'euclidean' and integer_cells else np.float64
+    cells1, cells2 = cells1.astype(work_dtype, copy=False), cells2.astype(work_dtype, copy=False)
+    if not pairwise:
+        dx, dy = np.abs(cells1[..., 0] - cells2[..., 0]), np.abs(cells1[..., 1] - cells2[..., 1])
+        return _grid_distance_block(dx, dy, metric).astype(dtype, copy=False)
+    cells1, cells2 = cells1.reshape(-1, 2), cells2.reshape(-1, 2)
+    x2, y2 = cells2[:, 0], cells2[:, 1]
+    distance = np.empty((len(cells1), len(cells2)), dtype=dtype)
+    rows = _chunk_rows(len(cells2), np.dtype(work_dtype).itemsize, max_memory_mb, n_temporaries=2)
+    for i in range(0, len(cells1), rows):
+        block = cells1[i:i + rows]
+        dx = np.abs(block[:, 0, None] - x2)
+        dy = np.abs(block[:, 1, None] - y2)
+        distance[i:i + rows] = _grid_distance_block(dx, dy, metric)
+    return distance
+
+
+def _lon_lat_to_unit_sphere(points):
+    lon, lat = np.radians(points[:, 0]), np.radians(points[:, 1])
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+class SpatialIndex(object):
+    """
+    Index over a set of points, built once and used for many radius queries.
+
+    Points are stored in a KD-tree. With the 'haversine' metric, (lon, lat) points in decimal
+    degrees are mapped on the unit sphere, where the chord distance grows with the great circle
+    one, so that radius queries expressed in kilometers are answered exactly.
+    """
+
+    def __init__(self, points, metric='euclidean'):
+        from scipy.spatial import cKDTree
+        if metric not in ('euclidean', 'haversine'):
+            raise ValueError("Metric '{}' not supported".format(metric))
+        self.metric = metric
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.tree = cKDTree(self._to_tree_space(self.points))
+
+    def __len__(self):
+        return len(self.points)
+
+    def _to_tree_space(self, points):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if self.metric == 'haversine':
+            return _lon_lat_to_unit_sphere(points)
+        return points
+
+    def _to_tree_radius(self, radius):
+        if self.metric == 'haversine':
+            return 2 * math.sin(min(radius / (2.0 * EARTH_RADIUS_KM), math.pi / 2))
+        return radius
+
+    def count_neighbours(self, radius, points=None, n_jobs=1):
+        """
+        Parameters
+        ----------
+        radius : the radius of the query, in kilometers for the 'haversine' metric
+        points : default None, the query points; if None, the indexed points themselves
+        n_jobs : default 1, number of workers for the query, -1 to use all the cores
+
+        Returns
+        -------
+        counts : ndarray, for each query point the number of indexed points within the radius
+            (the point itself included, if indexed)
+        """
+        query = self.tree.data if points is None else self._to_tree_space(points)
+        return np.asarray(self.tree.query_ball_point(query, self._to_tree_radius(radius), return_length=True,
+                                                     workers=n_jobs))
+
+
+def no_points_close_to_me(me, points, radius=100, index=None):
     """
     Parameters
     ----------
     me : tuple-like, the coordinates of the considered point
     points : list-like of tuple-like, all the other point in the world
     radius : the radius where 'me' should be alone
+    index : default None, a SpatialIndex built on points, to avoid the linear scan
 
     Returns
     -------
     result : true if the point is alone, false otherwise
     """
+    if index is not None:
+        return bool(index.count_neighbours(radius, [me])[0] <= 1)
     result = True
     number_of_close_points = 0
     for p in points:
@@ -69,6 +261,146 @@ def no_points_close_to_me(me, points, radius=100):
     return result
 
 
+def _refine_cell_pairs(cell_u, cell_v, first, counts, lon, lat, radius, max_pairs, result):
+    """Add to result, for each point of the cells cell_u, how many points of the paired cells cell_v
+    are within the radius, checking every pair of points with the haversine distance."""
+    pairs = counts[cell_u] * counts[cell_v]
+    chunk_ends = np.searchsorted(np.cumsum(pairs), np.arange(1, pairs.sum() // max_pairs + 2) * max_pairs)
+    chunk_start = 0
+    for chunk_end in np.unique(np.minimum(chunk_ends + 1, len(pairs))):
+        chunk = slice(chunk_start, chunk_end)
+        chunk_start = chunk_end
+        pair_cell = np.repeat(np.arange(chunk.stop - chunk.start), pairs[chunk])
+        position = np.arange(len(pair_cell)) - np.repeat(np.cumsum(pairs[chunk]) - pairs[chunk], pairs[chunk])
+        n_v = counts[cell_v[chunk]][pair_cell]
+        i = first[cell_u[chunk]][pair_cell] + position // n_v
+        j = first[cell_v[chunk]][pair_cell] + position % n_v
+        close = haversine_array(lon[i], lat[i], lon[j], lat[j]) <= radius
+        result += np.bincount(i[close], minlength=len(result))
+
+
+def approximate_neighbour_counts(lon, lat, radius, resolution=4, refine=False, max_pairs=10 ** 7):
+    """
+    Count, for each point, the points within a radius in terms of haversine distance, without
+    any tree: points are bucketed in cells of a uniform 3D grid over the Earth sphere, with side
+    s = r / resolution (r being the radius as a chord), and only neighbouring cells are checked.
+
+    Neighbouring cells entirely inside the radius are counted as a whole. Cells crossed by the
+    radius are either counted as a whole when their center is inside the radius (default), or
+    refined checking every pair of points with haversine (refine=True, exact result).
+    Without refinement, each point being at most sqrt(3) * s / 2 from its cell center, only the
+    pairs whose distance is between r - sqrt(3) * s and r + sqrt(3) * s can be miscounted, so
+    the count of each point lies between the exact counts for these two radii.
+
+    Memory stays around a few int64 arrays of length N (cell ids, sorting order, counts).
+
+    Parameters
+    ----------
+    lon, lat : array-like, longitudes and latitudes of the points, in decimal degrees
+    radius : the radius of the query, in kilometers
+    resolution : default 4, number of cells per radius; higher is more precise and slower
+    refine : default False, check every pair of points in the cells crossed by the radius
+    max_pairs : default 10 ** 7, maximum number of pairs of points checked at once when refining
+
+    Returns
+    -------
+    counts : ndarray, for each point the number of points within the radius (itself included)
+    """
+    lon, lat = np.asarray(lon, dtype=np.float64).ravel(), np.asarray(lat, dtype=np.float64).ravel()
+    if len(lon) == 0:
+        return np.zeros(0, dtype=np.int64)
+    chord = 2 * EARTH_RADIUS_KM * math.sin(min(radius / (2.0 * EARTH_RADIUS_KM), math.pi / 2))
+    side = chord / resolution
+    shift = int(math.ceil(EARTH_RADIUS_KM / side)) + resolution + 2
+    if chord <= 0 or 2 * shift >= 2 ** GRID_BITS:
+        raise ValueError("Radius {} is too small for the grid, use an exact SpatialIndex".format(radius))
+    cells = np.floor(_lon_lat_to_unit_sphere(np.column_stack([lon, lat])) * (EARTH_RADIUS_KM / side))
+    cells = cells.astype(np.int64) + shift
+    ids = (cells[:, 0] << (2 * GRID_BITS)) | (cells[:, 1] << GRID_BITS) | cells[:, 2]
+    del cells
+    order = np.argsort(ids)
+    cell_ids, counts = np.unique(ids[order], return_counts=True)
+    del ids
+    cumulative = np.concatenate([[0], np.cumsum(counts)])
+    totals = np.zeros(len(cell_ids), dtype=np.int64)
+    refined = np.zeros(len(lon), dtype=np.int64)
+
+    # Distances between cells are expressed in cell sides: a cell at offset d is entirely inside
+    # the radius if its farthest corner is, entirely outside if its nearest corner is outside
+    reach = resolution + 1
+    for dx in range(-reach, reach + 1):
+        for dy in range(-reach, reach + 1):
+            column = (dx << (2 * GRID_BITS)) + (dy << GRID_BITS)
+            dzs = np.arange(-reach, reach + 1)
+            if refine:
+                farthest = (abs(dx) + 1) ** 2 + (abs(dy) + 1) ** 2 + (np.abs(dzs) + 1) ** 2
+                nearest = max(abs(dx) - 1, 0) ** 2 + max(abs(dy) - 1, 0) ** 2 + np.maximum(np.abs(dzs) - 1, 0) ** 2
+                inside = farthest <= resolution ** 2
+                crossed = dzs[~inside & (nearest <= resolution ** 2)]
+            else:
+                inside = dx ** 2 + dy ** 2 + dzs ** 2 <= resolution ** 2
+                crossed = []
+            if inside.any():
+                # Cells at offsets (dx, dy, -a..a) have consecutive ids
+                a = dzs[inside].max()
+                low = np.searchsorted(cell_ids, cell_ids + column - a, side='left')
+                high = np.searchsorted(cell_ids, cell_ids + column + a, side='right')
+                totals += cumulative[high] - cumulative[low]
+            for dz in crossed:
+                neighbours = cell_ids + column + dz
+                position = np.minimum(np.searchsorted(cell_ids, neighbours), len(cell_ids) - 1)
+                found = cell_ids[position] == neighbours
+                _refine_cell_pairs(np.flatnonzero(found), position[found], cumulative[:-1], counts,
+                                   lon[order], lat[order], radius, max_pairs, refined)
+
+    result = np.empty(len(lon), dtype=np.int64)
+    result[order] = np.repeat(totals, counts) + refined
+    return result
+
+
+def isolated_points(points, radius=100, max_memory_mb=256, n_jobs=1):
+    """
+    Batch version of no_points_close_to_me, for all the points at once.
+    Euclidean distances are computed in blocks of rows against all the points, and the blocks
+    can be spread over a pool of threads (numpy releases the GIL while computing them).
+
+    Parameters
+    ----------
+    points : array-like of shape (n, 2), the coordinates of all the points
+    radius : default 100, the radius where each point should be alone
+    max_memory_mb : default 256, memory budget for the distance blocks, shared by all the threads
+    n_jobs : default 1, number of threads, -1 to use all the cores
+
+    Returns
+    -------
+    isolated : ndarray of bool, true if the point is alone, false otherwise
+    counts : ndarray, the number of other points within the radius of each point
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    x, y = points[:, 0], points[:, 1]
+    squared_radius = radius ** 2
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    rows = _chunk_rows(len(points), points.itemsize, max_memory_mb / float(n_jobs), n_temporaries=3)
+    counts = np.empty(len(points), dtype=np.intp)
+
+    def count_block(start):
+        block = slice(start, start + rows)
+        squared_distances = (x[block, None] - x) ** 2
+        squared_distances += (y[block, None] - y) ** 2
+        # The point itself is always within the radius
+        counts[block] = np.count_nonzero(squared_distances <= squared_radius, axis=1) - 1
+
+    starts = range(0, len(points), rows)
+    if n_jobs == 1:
+        for start in starts:
+            count_block(start)
+    else:
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            list(pool.map(count_block, starts))
+    return counts == 0, counts
+
+
 def cluster_most_representative(cluster, center, field, n=1):
     """
     Find the most representative element in the cluster,
@@ -85,6 +417,7 @@ def cluster_most_representative(cluster, center, field, n=1):
     -------
     element: the closest n elemente in the cluster to the center
     """
+    from scipy.spatial.distance import euclidean
     all_tuples = []  # will contain each element with its distance from the center
     for elem in cluster:
         dist = euclidean(elem[field], center)
@@ -94,6 +427,103 @@ def cluster_most_representative(cluster, center, field, n=1):
     return most_representatives[:n]
 
 
+def _counting_sort_order(labels, n_labels):
+    """
+    Stable order grouping the non negative integer labels, in O(N) for any number of labels:
+    numpy sorts 16 bit integers with a radix sort, so the labels are sorted by 16 bit digits,
+    from the least significant one (LSD radix sort).
+    """
+    order = np.arange(len(labels))
+    shift = 0
+    while True:
+        digits = ((labels[order] >> shift) & 0xFFFF).astype(np.uint16)
+        order = order[np.argsort(digits, kind='stable')]
+        shift += 16
+        if (max(n_labels, 1) - 1) >> shift == 0:
+            return order
+
+
+def cluster_representatives(features, labels, centroids, n=1):
+    """
+    Batch version of cluster_most_representative, for all the clusters at once.
+    The distances of all the elements from their centroid are computed in a single vectorized
+    pass, the elements are grouped by cluster with a counting (radix) sort and the n closest
+    elements of each cluster are selected with np.argpartition, O(N) in total.
+
+    Parameters
+    ----------
+    features: array-like of shape (N, d), the values used for the clustering
+    labels: array-like of N int, the cluster of each element, as row index in centroids
+    centroids: array-like of shape (k, d), the center of each cluster
+    n: default 1, number of representatives per cluster
+
+    Returns
+    -------
+    representatives: list of k arrays, with the indices of the closest n elements of each
+        cluster to its center, from the closest (fewer if the cluster is smaller)
+    """
+    features = np.asarray(features, dtype=np.float64)
+    centroids = np.asarray(centroids, dtype=np.float64)
+    labels = np.asarray(labels, dtype=np.intp)
+    distances = np.sqrt(((features - centroids[labels]) ** 2).sum(axis=1))
+    order = _counting_sort_order(labels, len(centroids))
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=len(centroids)))])
+    representatives = []
+    for cluster in range(len(centroids)):
+        members = order[bounds[cluster]:bounds[cluster + 1]]
+        if len(members) > n:
+            members = members[np.argpartition(distances[members], n - 1)[:n]]
+        representatives.append(members[np.argsort(distances[members], kind='stable')])
+    return representatives
+
+
+def _contingency_matrix(codes1, codes2, n1, n2):
+    """Dense (n1, n2) matrix counting the elements for each pair of integer label codes."""
+    return np.bincount(codes1 * n2 + codes2, minlength=n1 * n2).reshape(n1, n2)
+
+
+def _optimal_relabelling(labels_c1, labels_c2):
+    """
+    Find the renaming of the labels in the second labelling maximizing the matchings with the first one.
+    The contingency matrix of the two labellings is built once, then the best renaming
+    is an assignment problem, solved with the Hungarian algorithm.
+
+    Parameters
+    ----------
+    labels_c1: array-like, the labels given by the first labelling to each element
+    labels_c2: array-like, the labels given by the second labelling to the same elements
+
+    Returns
+    -------
+    re_label: a dictionary for the renaming of the labels in the second labelling
+    matchings: the number of elements with the same label after the renaming
+    """
+    import pandas as pd
+    from scipy.optimize import linear_sum_assignment
+    codes2, labels = pd.factorize(np.asarray(labels_c2))
+    codes1 = pd.Index(labels).get_indexer(np.asarray(labels_c1))
+    labels = labels.tolist()
+    # Labels of the first labelling never used in the second one can't be matched
+    known = codes1 >= 0
+    contingency = _contingency_matrix(codes1[known], codes2[known], len(labels), len(labels))
+    row_ind, col_ind = linear_sum_assignment(-contingency)
+    re_label = {labels[col]: labels[row] for row, col in zip(row_ind, col_ind)}
+    return re_label, int(contingency[row_ind, col_ind].sum())
+
+
+def _compare_cluster_frames(c1, c2, name_col='name', label_col='label'):
+    # Mantain only the co-occurring names
+    c1, c2 = c1[c1[name_col].isin(c2[name_col])], c2[c2[name_col].isin(c1[name_col])]
+    label_c1 = c1.drop_duplicates(name_col, keep='last').set_index(name_col)[label_col]
+    re_label, n_matchings = _optimal_relabelling(c2[name_col].map(label_c1), c2[label_col])
+    # Rebuild the second cluster
+    c2 = c2.assign(**{label_col: c2[label_col].map(re_label)})
+    aligned = c1[[name_col, label_col]].merge(c2.drop_duplicates(name_col, keep='last')[[name_col, label_col]],
+                                              on=name_col, how='left', suffixes=('_c1', '_c2'))
+    matchings = aligned[name_col].values[(aligned[label_col + '_c1'] == aligned[label_col + '_c2']).values]
+    return c1, c2, matchings, n_matchings / len(c1), re_label
+
+
 def compare_clusters(c1, c2):
     """
     Compare two different labellings on the same set of elements.
@@ -101,7 +531,8 @@ def compare_clusters(c1, c2):
 
     Parameters
     ----------
-    c1: first labelling, list of dict. Each dict should contain the name and the label
+    c1: first labelling, list of dict. Each dict should contain the name and the label.
+        A DataFrame with 'name' and 'label' columns is accepted too
     c2: second labelling, as above
 
     Returns
@@ -111,41 +542,155 @@ def compare_clusters(c1, c2):
     accuracy: the accuracy between the two different labellings
     re_label: a dictionary for the renaming of the labels in the second clustering
     """
+    import pandas as pd
+    if isinstance(c1, pd.DataFrame) or isinstance(c2, pd.DataFrame):
+        return _compare_cluster_frames(pd.DataFrame(c1), pd.DataFrame(c2))
     # Mantain only the co-occurring names
-    names_c1, names_c2 = [elem['name'] for elem in c1], [elem['name'] for elem in c2]
+    names_c1, names_c2 = set(elem['name'] for elem in c1), set(elem['name'] for elem in c2)
     c1 = [elem for elem in c1 if elem['name'] in names_c2]
     c2 = [elem for elem in c2 if elem['name'] in names_c1]
-    labels = set([elem['label'] for elem in c2])
-    # Evaluate each permutation
-    permutations = itertools.permutations(labels)
-    result = []
-    for permutation in permutations:
-        re_label = {}
-        # Map for the new labelling
-        for l in range(len(labels)):
-            re_label[l] = permutation[l]
-        matchings = 0
-        for label in labels:
-            from_c1 = [elem['name'] for elem in c1 if elem['label'] == label]
-            from_c2 = [elem['name'] for elem in c2 if re_label[elem['label']] == label]
-            matchings += len(set(from_c1) & set(from_c2))
-        result.append({'permutation': permutation, 'matchings': matchings})
-    # Get the best permutation
-    best = [r for r in result if r['matchings'] == max([r['matchings'] for r in result])][0]
-    re_label = {}
-    for l in range(len(labels)):
-        re_label[l] = best['permutation'][l]
+    label_c1 = {elem['name']: elem['label'] for elem in c1}
+    re_label, n_matchings = _optimal_relabelling([label_c1[elem['name']] for elem in c2],
+                                                 [elem['label'] for elem in c2])
     # Rebuild the second cluster
     c2 = [{'name': elem['name'], 'label': re_label[elem['label']]} for elem in c2]
-    matchings = []
-    for e1 in c1:
-        label = e1['label']
-        name = e1['name']
-        for e2 in c2:
-            if name == e2['name'] and label == e2['label']:
-                matchings.append(name)
+    label_c2 = {elem['name']: elem['label'] for elem in c2}
+    matchings = [elem['name'] for elem in c1 if label_c2[elem['name']] == elem['label']]
     # Returns the labellings, the matchings, the accuracy, and the renaming dictionary
-    return (c1, c2, matchings, best['matchings'] / len(c1), re_label)
+    return (c1, c2, matchings, n_matchings / len(c1), re_label)
+
+
+def compare_labellings(names1, labels1, names2, labels2):
+    """
+    Columnar version of compare_clusters, for labellings given as arrays of names and labels.
+
+    Parameters
+    ----------
+    names1, labels1: array-like, the names and the labels of the first labelling
+    names2, labels2: array-like, the names and the labels of the second labelling
+
+    Returns
+    -------
+    new_c1, new_c2: the new labellings, as DataFrames with 'name' and 'label' columns
+    matchings: array with the name of such elements that are matching between the two clusterings
+    accuracy: the accuracy between the two different labellings
+    re_label: a dictionary for the renaming of the labels in the second clustering
+    """
+    import pandas as pd
+    c1 = pd.DataFrame({'name': names1, 'label': labels1})
+    c2 = pd.DataFrame({'name': names2, 'label': labels2})
+    return _compare_cluster_frames(c1, c2)
+
+
+def _entropy(counts, n):
+    p = counts[counts > 0] / float(n)
+    return float(-(p * np.log(p)).sum())
+
+
+def _pairs(counts):
+    counts = np.asarray(counts, dtype=np.float64)
+    return float((counts * (counts - 1) / 2).sum())
+
+
+def _sparse_max_weight_matching(contingency):
+    """ Maximum weight matching of the rows with the columns of a sparse contingency matrix """
+    from scipy import sparse
+    from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+    n_rows, n_cols = contingency.shape
+    # A full matching may not exist among the non zero cells: each row gets also a dummy column, with the
+    # weight of an empty cell, so that minimizing (top - n_ij) maximizes the sum of the matched cells
+    top = contingency.data.max() + 1
+    weights = contingency.copy()
+    weights.data = top - weights.data
+    weights = sparse.hstack([weights, sparse.identity(n_rows, format='csr') * top], format='csr')
+    row_ind, col_ind = min_weight_full_bipartite_matching(weights)
+    real = col_ind < n_cols
+    return row_ind[real], col_ind[real]
+
+
+def clustering_agreement(labels_true, labels_pred, max_dense_cells=10 ** 7):
+    """
+    Agreement metrics between two labellings of the same elements, all derived from a single
+    sparse contingency matrix: accuracy after the optimal matching of the labels (as in
+    compare_clusters), adjusted Rand index, normalized mutual information (arithmetic mean
+    normalization), homogeneity, completeness, V-measure and purity.
+
+    Parameters
+    ----------
+    labels_true: array-like, the reference label of each element
+    labels_pred: array-like, the predicted label of the same elements
+    max_dense_cells: default 10 ** 7, maximum number of cells (reference labels times
+        predicted labels) of the contingency matrix handled as a dense array. Larger matrices
+        stay sparse: the labels are matched with a sparse bipartite matching and the confusion
+        matrix is returned as a scipy.sparse CSR matrix
+
+    Returns
+    -------
+    metrics: dictionary with 'accuracy', 'adjusted_rand_index', 'normalized_mutual_info',
+        'homogeneity', 'completeness', 'v_measure' and 'purity'. 'confusion_matrix' has the
+        reference labels on the rows ('labels_true') and the predicted ones on the columns
+        ('labels_pred'), sorted so that matched labels lay on the diagonal, ready for
+        visualization.plot_confusion_matrix
+    """
+    from scipy import sparse
+    import pandas as pd
+    from scipy.optimize import linear_sum_assignment
+    codes_true, classes = pd.factorize(np.asarray(labels_true), sort=True)
+    codes_pred, clusters = pd.factorize(np.asarray(labels_pred), sort=True)
+    if len(codes_true) != len(codes_pred):
+        raise ValueError("Labellings have different lengths: {} and {}".format(len(codes_true), len(codes_pred)))
+    n = len(codes_true)
+    if n == 0:
+        raise ValueError("Labellings are empty")
+    contingency = sparse.coo_matrix((np.ones(n, dtype=np.int64), (codes_true, codes_pred)),
+                                    shape=(len(classes), len(clusters))).tocsr()
+    rows, cols = np.repeat(np.arange(len(classes)), np.diff(contingency.indptr)), contingency.indices
+    n_ij = contingency.data.astype(np.float64)
+    a = np.bincount(rows, weights=n_ij, minlength=len(classes))
+    b = np.bincount(cols, weights=n_ij, minlength=len(clusters))
+
+    # Adjusted Rand index, from the pairs of elements
+    sum_comb, sum_a, sum_b = _pairs(n_ij), _pairs(a), _pairs(b)
+    expected = sum_a * sum_b / (n * (n - 1) / 2.0) if n > 1 else 0.0
+    max_index = (sum_a + sum_b) / 2.0
+    ari = 1.0 if max_index == expected else (sum_comb - expected) / (max_index - expected)
+
+    # Information theoretic measures
+    h_true, h_pred = _entropy(a, n), _entropy(b, n)
+    mutual_info = float((n_ij / n * (np.log(n_ij * n) - np.log(a[rows] * b[cols]))).sum())
+    mutual_info = max(mutual_info, 0.0)
+    homogeneity = 1.0 if h_true == 0 else mutual_info / h_true
+    completeness = 1.0 if h_pred == 0 else mutual_info / h_pred
+    v_measure = 0.0 if homogeneity + completeness == 0 else (2 * homogeneity * completeness
+                                                             / (homogeneity + completeness))
+    nmi = 1.0 if h_true == h_pred == 0 else mutual_info / ((h_true + h_pred) / 2)
+
+    # Optimal matching of the labels, and matched labels on the diagonal of the confusion matrix
+    dense = len(classes) * len(clusters) <= max_dense_cells
+    if dense:
+        confusion = contingency.toarray()
+        row_ind, col_ind = linear_sum_assignment(-confusion)
+    else:
+        confusion = contingency
+        row_ind, col_ind = _sparse_max_weight_matching(contingency)
+    # Each matched column goes on the position of its row, when it exists, the others fill the gaps
+    columns = np.full(len(clusters), -1, dtype=np.int64)
+    diagonal = row_ind < len(clusters)
+    columns[row_ind[diagonal]] = col_ind[diagonal]
+    free = columns < 0
+    columns[free] = np.setdiff1d(np.arange(len(clusters)), columns[~free])
+    return {
+        'accuracy': np.asarray(confusion[row_ind, col_ind]).sum() / float(n),
+        'adjusted_rand_index': ari,
+        'normalized_mutual_info': nmi,
+        'homogeneity': homogeneity,
+        'completeness': completeness,
+        'v_measure': v_measure,
+        'purity': contingency.tocsc().max(axis=0).sum() / float(n),
+        'confusion_matrix': confusion[:, columns],
+        'labels_true': classes.tolist(),
+        'labels_pred': clusters[columns].tolist(),
+    }
 
 
 def test_compare_cluster():
@@ -1,12 +1,12 @@
+import numpy as np
 import pandas as pd
 from collections import Counter
 from functools import reduce
-from sklearn.utils import shuffle
 
 from giammis.utils.generic import identity_func
 
 
-def optimize_memory_usage(df, types_to_numeric=None, types_to_category=None, verbose=False):
+def optimize_memory_usage(df, types_to_numeric=None, types_to_category=None, verbose=False, return_schema=False):
     """
 
     Args:
@@ -14,11 +14,14 @@ def optimize_memory_usage(df, types_to_numeric=None, types_to_category=None, ver
         types_to_numeric (list|None):
         types_to_category (list|None):
         verbose (bool):
+        return_schema (bool): return also the dtype schema of the result, to apply to other frames with
+            apply_dtype_schema or to pass to readers with schema_to_dtypes
 
     Returns:
-        DataFrame:
+        DataFrame|(DataFrame, dict): the optimized DataFrame, and {column: {'dtype': str, 'categories': list}}
     """
-    df_to_optimize = pd.DataFrame(df.copy())
+    # Columns are replaced and never modified, a shallow copy is enough
+    df_to_optimize = pd.DataFrame(df).copy(deep=False)
     if types_to_numeric is None:
         types_to_numeric = ['float', 'integer']
     if types_to_category is None:
@@ -32,7 +35,7 @@ def optimize_memory_usage(df, types_to_numeric=None, types_to_category=None, ver
     for type_to_category in types_to_category:
         type_to_category_columns = df_to_optimize.select_dtypes(include=[type_to_category]).columns
         for col in type_to_category_columns:
-            if len(df_to_optimize[col].unique()) < len(df_to_optimize[col]) // 4:
+            if df_to_optimize[col].nunique(dropna=False) < len(df_to_optimize[col]) // 4:
                 df_to_optimize[col] = df_to_optimize[col].astype('category')
     if verbose:
         memory_before_mb = df.memory_usage(deep=True).sum() / (2.0 ** 20)
@@ -40,9 +43,255 @@ def optimize_memory_usage(df, types_to_numeric=None, types_to_category=None, ver
         print("Memory usage before:\t\t\t{} MB".format(memory_before_mb))
         print("Memory usage after:\t\t\t{} MB".format(memory_after_mb))
         print("Percentage of the optimized file:\t{} %".format(memory_after_mb / memory_before_mb * 100.0))
+    if return_schema:
+        return df_to_optimize, dtype_schema(df_to_optimize)
     return df_to_optimize
 
 
+def dtype_schema(df):
+    """Describe the dtypes of a DataFrame with a serialisable schema, with the vocabulary of the category columns.
+
+    Args:
+        df (DataFrame):
+
+    Returns:
+        dict: {column: {'dtype': str, 'categories': list (only for 'category')}}
+    """
+    schema = {}
+    for col, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            schema[col] = {'dtype': 'category', 'categories': dtype.categories.tolist()}
+        else:
+            schema[col] = {'dtype': str(dtype)}
+    return schema
+
+
+def apply_dtype_schema(df, schema):
+    """Convert a DataFrame to the dtypes of a schema, as returned by optimize_memory_usage or
+    optimize_memory_usage_from_file, with one astype per column. Category columns get exactly the categories
+    of the schema, so that their codes are the same across frames: values out of them become missing.
+    Integer columns are never overflowed: values out of the range of the dtype widen it (e.g. 300 in an int8
+    column gives int16), missing values give the nullable dtype (e.g. Int8), non integer values raise a ValueError.
+
+    Args:
+        df (DataFrame):
+        schema (dict): {column: {'dtype': str, 'categories': list}}
+
+    Returns:
+        DataFrame: columns not in the schema are left as they are
+    """
+    return _apply_dtypes(df, schema_to_dtypes(schema))
+
+
+def _smallest_integer_dtype(low, high):
+    for dtype in ('int8', 'int16', 'int32', 'int64'):
+        if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+            return dtype
+    return 'uint64'
+
+
+def _is_text_dtype(dtype):
+    return (pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)) and \
+        not pd.api.types.is_bool_dtype(dtype)
+
+
+def _file_format(path, file_format):
+    if file_format is None:
+        file_format = 'parquet' if str(path).lower().endswith(('.parquet', '.pq')) else 'csv'
+    if file_format not in ('csv', 'parquet'):
+        raise ValueError("File format '{}' not supported".format(file_format))
+    return file_format
+
+
+def _read_chunks(path, chunksize, file_format, **read_kwargs):
+    """Iterate over the DataFrame chunks of a csv file, or of a parquet file with pyarrow."""
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, **read_kwargs):
+            yield batch.to_pandas()
+    else:
+        for chunk in pd.read_csv(path, chunksize=chunksize, **read_kwargs):
+            yield chunk
+
+
+def infer_dtype_schema(path, chunksize=10 ** 6, types_to_numeric=None, types_to_category=None, max_categories=10000,
+                       file_format=None, **read_kwargs):
+    """Scan a file larger than memory in chunks and infer the same dtypes chosen by optimize_memory_usage:
+    the narrowest integer type from the running min and max, float32 when every chunk is downcast to it by
+    pd.to_numeric(downcast='float') (values within the float32 range, rounding to float32 precision accepted),
+    and categories for the text columns with less distinct values than a quarter of the rows.
+    The distinct values are tracked only up to max_categories, above that the column stays as it is.
+
+    Args:
+        path (str): csv file, or parquet file (read with pyarrow)
+        chunksize (int): number of rows per chunk
+        types_to_numeric (list|None): default ['float', 'integer']
+        types_to_category (list|None): default ['object']
+        max_categories (int): maximum number of categories of a column
+        file_format (str|None): 'csv' or 'parquet', default from the extension of the file
+        **read_kwargs: passed to pandas.read_csv or pyarrow.parquet.ParquetFile.iter_batches
+
+    Returns:
+        dict: {column: {'dtype': str, 'categories': list (only for 'category')}}
+    """
+    if types_to_numeric is None:
+        types_to_numeric = ['float', 'integer']
+    if types_to_category is None:
+        types_to_category = ['object']
+    n_rows = 0
+    stats = {}
+    for chunk in _read_chunks(path, chunksize, _file_format(path, file_format), **read_kwargs):
+        n_rows += len(chunk)
+        for col in chunk.columns:
+            stat = stats.setdefault(col, {'kind': None, 'low': 0, 'high': 0, 'float': 'float32', 'values': set()})
+            series = chunk[col]
+            stat['dtype'] = str(series.dtype)
+            if pd.api.types.is_bool_dtype(series.dtype):
+                kind = 'bool'
+            elif pd.api.types.is_integer_dtype(series.dtype):
+                kind = 'integer'
+            elif pd.api.types.is_float_dtype(series.dtype):
+                kind = 'float'
+            elif _is_text_dtype(series.dtype):
+                kind = 'object'
+            else:
+                kind = str(series.dtype)
+            # Integers with missing values in other chunks are read as float
+            if {stat['kind'], kind} == {'integer', 'float'}:
+                kind = 'float'
+            elif stat['kind'] not in (None, kind):
+                # Mixed types: the distinct values of the other chunks are not known
+                kind, stat['values'] = 'object', None
+            stat['kind'] = kind
+            if kind == 'integer' and len(series):
+                stat['low'], stat['high'] = min(stat['low'], series.min()), max(stat['high'], series.max())
+            elif kind == 'float' and stat['float'] == 'float32':
+                stat['float'] = str(pd.to_numeric(series.astype('float64'), downcast='float').dtype)
+            elif kind == 'object' and stat['values'] is not None:
+                stat['values'].update(series.dropna().unique().tolist())
+                if len(stat['values']) > max_categories:
+                    stat['values'] = None
+
+    schema = {}
+    for col, stat in stats.items():
+        kind = stat['kind']
+        if kind == 'integer' and 'integer' in types_to_numeric:
+            schema[col] = {'dtype': _smallest_integer_dtype(stat['low'], stat['high'])}
+        elif kind == 'integer':
+            schema[col] = {'dtype': 'int64'}
+        elif kind == 'float':
+            schema[col] = {'dtype': stat['float'] if 'float' in types_to_numeric else 'float64'}
+        elif kind == 'object' and 'object' in types_to_category and stat['values'] is not None and \
+                len(stat['values']) < n_rows // 4:
+            schema[col] = {'dtype': 'category', 'categories': sorted(stat['values'])}
+        elif kind == 'object':
+            schema[col] = {'dtype': stat['dtype'] if _is_text_dtype(stat['dtype']) else 'object'}
+        else:
+            schema[col] = {'dtype': kind}
+    return schema
+
+
+def schema_to_dtypes(schema):
+    """Convert a dtype schema into the dtypes to pass as dtype= to readers or to DataFrame.astype.
+
+    Args:
+        schema (dict): {column: {'dtype': str, 'categories': list}}
+
+    Returns:
+        dict: {column: dtype}, with a CategoricalDtype for the category columns
+    """
+    return {col: pd.CategoricalDtype(spec['categories']) if spec['dtype'] == 'category' else spec['dtype']
+            for col, spec in schema.items()}
+
+
+def _widened_integer_dtype(values, dtype):
+    """Integer dtype for the values: dtype itself, or the narrowest wider one holding all of them, and its nullable
+    version (e.g. Int8) when there are missing values.
+    Non integer values can not be converted without losing them and raise a ValueError."""
+    dtype = pd.api.types.pandas_dtype(dtype)
+    nullable = isinstance(dtype, pd.api.extensions.ExtensionDtype)
+    numpy_dtype = np.dtype(dtype.numpy_dtype if nullable else dtype)
+    valid = values.dropna()
+    if len(valid) and pd.api.types.is_float_dtype(valid.dtype) and not (valid == np.round(valid)).all():
+        raise ValueError("Column '{}' has non integer values, can not be converted to {}".format(values.name, dtype))
+    if len(valid):
+        low, high = valid.min(), valid.max()
+        info = np.iinfo(numpy_dtype)
+        if low < info.min or high > info.max:
+            numpy_dtype = np.promote_types(numpy_dtype, _smallest_integer_dtype(low, high))
+            if numpy_dtype.kind not in 'iu':
+                raise ValueError("Column '{}' has values in [{}, {}], out of any integer dtype".format(
+                    values.name, low, high))
+    if nullable or len(valid) < len(values):
+        return '{}Int{}'.format('U' if numpy_dtype.kind == 'u' else '', numpy_dtype.itemsize * 8)
+    return str(numpy_dtype)
+
+
+def _apply_dtypes(df, dtypes):
+    """Convert the columns of df to the given dtypes, with the values out of the categories as missing.
+    Integer columns with values out of the range of their dtype are widened instead of overflowing, and get
+    the nullable dtype (e.g. Int8) when they have missing values."""
+    converted = {}
+    for col, dtype in dtypes.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        values = df[col]
+        if isinstance(dtype, pd.CategoricalDtype):
+            converted[col] = values.where(values.isin(dtype.categories)).astype(dtype)
+        elif pd.api.types.is_integer_dtype(dtype):
+            converted[col] = values.astype(_widened_integer_dtype(values, dtype))
+        else:
+            converted[col] = values.astype(dtype)
+    return df.assign(**converted) if converted else df
+
+
+def optimize_memory_usage_from_file(path, schema=None, chunksize=10 ** 6, types_to_numeric=None,
+                                    types_to_category=None, max_categories=10000, file_format=None, verbose=False,
+                                    **read_kwargs):
+    """Streaming version of optimize_memory_usage: infer the dtype schema of a file with infer_dtype_schema,
+    unless given from a previous load, and read the file directly with it.
+    The file is read again in chunks, each one converted as soon as it is read. With a given schema, values out
+    of the categories are read as missing, and integer columns with values out of the range of their dtype are
+    widened or made nullable, as recorded in the returned schema.
+
+    Args:
+        path (str): csv file, or parquet file (read with pyarrow)
+        schema (dict|None): schema returned by a previous call, to skip the inference
+        chunksize (int): number of rows per chunk
+        types_to_numeric (list|None):
+        types_to_category (list|None):
+        max_categories (int):
+        file_format (str|None): 'csv' or 'parquet', default from the extension of the file
+        verbose (bool):
+        **read_kwargs: passed to pandas.read_csv or pyarrow.parquet.ParquetFile.iter_batches
+
+    Returns:
+        DataFrame, dict: the optimized DataFrame and its schema
+    """
+    file_format = _file_format(path, file_format)
+    if schema is None:
+        schema = infer_dtype_schema(path, chunksize=chunksize, types_to_numeric=types_to_numeric,
+                                    types_to_category=types_to_category, max_categories=max_categories,
+                                    file_format=file_format, **read_kwargs)
+    dtypes = schema_to_dtypes(schema)
+    if file_format == 'csv':
+        # Category and integer columns are read with the default dtypes and converted chunk by chunk, checking
+        # categories and integer ranges (see _apply_dtypes); dates are parsed only through parse_dates
+        read_kwargs['dtype'] = {col: dtype for col, dtype in dtypes.items()
+                                if not isinstance(dtype, pd.CategoricalDtype) and
+                                not pd.api.types.is_integer_dtype(dtype) and
+                                not pd.api.types.is_datetime64_any_dtype(dtype)}
+    # Convert each chunk as soon as it is read, never holding the whole file with the original dtypes
+    chunks = [_apply_dtypes(chunk, dtypes) for chunk in _read_chunks(path, chunksize, file_format, **read_kwargs)]
+    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=list(dtypes)).astype(dtypes)
+    # Integer columns widened or made nullable for this file
+    schema = dict(schema, **{col: {'dtype': str(df[col].dtype)} for col, dtype in dtypes.items()
+                             if col in df.columns and pd.api.types.is_integer_dtype(dtype) and df[col].dtype != dtype})
+    if verbose:
+        print("Memory usage:\t\t\t{} MB".format(df.memory_usage(deep=True).sum() / (2.0 ** 20)))
+    return df, schema
+
+
 # TODO unittest and maybe pass only a list without first value
 def join_multiple(df_initial, df_list, on, how='inner'):
     """
@@ -87,82 +336,270 @@ def explode_list_column(df, column, filling_value, renaming_func=identity_func,
     return pivot
 
 
-def enrich_with_simple_time_features(df, timestamp_key):
-    """
+SIMPLE_TIME_FEATURES = ['MONTH', 'WEEK', 'WEEKEND', 'WEEKDAY', 'HOUR']
+# Period of the cyclic features, encoded in '{FEATURE}_SIN' and '{FEATURE}_COS' (DAYOFYEAR depends on the year)
+CYCLIC_TIME_PERIODS = {'MINUTE': 60, 'HOUR': 24, 'WEEKDAY': 7, 'MONTH': 12, 'DAYOFYEAR': None}
+DAY_NS = 24 * 60 * 60 * 10 ** 9
+
+
+def _day_time_features(days, features):
+    """Compute the calendar features of an array of days since epoch, on a lookup table of the days they span."""
+    if len(days) and days.max() - days.min() < len(days):
+        first, last = days.min(), days.max()
+        table_days, index = np.arange(first, last + 1), days - first
+    else:
+        table_days, index = days, None
+    dt = pd.Series(table_days.astype('datetime64[D]')).dt
+    result = {}
+    for feature in features:
+        if feature == 'WEEK':
+            values = dt.isocalendar().week.values.astype('int8')
+        elif feature == 'IS_LEAP_YEAR':
+            values = dt.is_leap_year.values
+        else:
+            values = getattr(dt, feature.lower()).values.astype('int16' if feature == 'DAYOFYEAR' else 'int8')
+        result[feature] = values if index is None else values[index]
+    return result
+
+
+def enrich_with_simple_time_features(df, timestamp_key, features=None, inplace=False):
+    """Add simple time features of a timestamp column, computed on the datetime64 values in a single pass:
+    time of day features with integer arithmetic, calendar features on a lookup table of the days.
 
     Args:
         df (DataFrame):
+        timestamp_key (str):
+        features (list[str]|None): features to add among MONTH, WEEK (ISO week), WEEKEND, WEEKDAY, HOUR, MINUTE,
+            QUARTER, DAYOFYEAR and the cyclic encodings MINUTE/HOUR/WEEKDAY/MONTH/DAYOFYEAR + _SIN/_COS;
+            default MONTH, WEEK, WEEKEND, WEEKDAY and HOUR
+        inplace (bool): add the features to df instead of a copy
 
     Returns:
-        DataFrame:
+        DataFrame: with int8 (int16 for DAYOFYEAR) features, bool WEEKEND and float32 cyclic encodings;
+            missing timestamps give missing features, with the nullable Int8, Int16 and boolean dtypes
     """
-    df_copy = pd.DataFrame(df.copy())
-    # Adding simple time based features
-    df_copy['MONTH'] = df_copy[timestamp_key].apply(lambda x: x.month)
-    df_copy['WEEK'] = df_copy[timestamp_key].apply(lambda x: x.week)
-    df_copy['WEEKEND'] = df_copy[timestamp_key].apply(lambda x: 1 if x.weekday() >= 5 else 0)
-    df_copy['WEEKDAY'] = df_copy[timestamp_key].apply(lambda x: x.weekday())
-    df_copy['HOUR'] = df_copy[timestamp_key].apply(lambda x: x.hour)
-    return df_copy
+    if features is None:
+        features = SIMPLE_TIME_FEATURES
+    base_features = [feature[:-4] if feature[-4:] in ('_SIN', '_COS') else feature for feature in features]
+    for feature, base_feature in zip(features, base_features):
+        if base_feature not in ('MONTH', 'WEEK', 'WEEKEND', 'WEEKDAY', 'HOUR', 'MINUTE', 'QUARTER', 'DAYOFYEAR') or \
+                (feature != base_feature and base_feature not in CYCLIC_TIME_PERIODS):
+            raise ValueError("Time feature '{}' not supported".format(feature))
+
+    timestamps = pd.to_datetime(df[timestamp_key])
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_localize(None)
+    ns = timestamps.values.astype('datetime64[ns]').view('int64')
+    missing = np.isnat(timestamps.values)
+    ns = np.where(missing, ns[~missing][0] if not missing.all() else 0, ns)
+
+    values = {}
+    if 'HOUR' in base_features:
+        values['HOUR'] = (ns % DAY_NS // (3600 * 10 ** 9)).astype('int8')
+    if 'MINUTE' in base_features:
+        values['MINUTE'] = (ns % (3600 * 10 ** 9) // (60 * 10 ** 9)).astype('int8')
+    days = ns // DAY_NS
+    if 'WEEKDAY' in base_features or 'WEEKEND' in base_features:
+        # 1970-01-01 was a Thursday
+        values['WEEKDAY'] = ((days + 3) % 7).astype('int8')
+    day_features = [feature for feature in ('MONTH', 'WEEK', 'QUARTER', 'DAYOFYEAR') if feature in base_features]
+    if 'DAYOFYEAR_SIN' in features or 'DAYOFYEAR_COS' in features:
+        day_features.append('IS_LEAP_YEAR')
+    if day_features:
+        values.update(_day_time_features(days, day_features))
+
+    df_enriched = df if inplace else df.copy(deep=False)
+    for feature, base_feature in zip(features, base_features):
+        if feature == 'WEEKEND':
+            feature_values = values['WEEKDAY'] >= 5
+        elif feature != base_feature:
+            cycle = values[base_feature].astype('float64') - (1 if base_feature in ('MONTH', 'DAYOFYEAR') else 0)
+            if base_feature == 'DAYOFYEAR':
+                period = 365 + values['IS_LEAP_YEAR']
+            else:
+                period = CYCLIC_TIME_PERIODS[base_feature]
+            trigonometric = np.sin if feature.endswith('_SIN') else np.cos
+            feature_values = trigonometric(2 * np.pi * cycle / period).astype('float32')
+            feature_values[missing] = np.nan
+        else:
+            feature_values = values[feature]
+        if missing.any() and feature_values.dtype != 'float32':
+            if feature_values.dtype == bool:
+                feature_values = pd.arrays.BooleanArray(feature_values, missing)
+            else:
+                feature_values = pd.arrays.IntegerArray(feature_values, missing)
+        df_enriched[feature] = pd.Series(feature_values, index=df.index)
+    return df_enriched
+
+
+def _sorted_groups(df, subject_col, timestamp_col):
+    """Sort once by subject and timestamp, keeping the original position of the rows.
 
+    Args:
+        df (DataFrame):
+        subject_col (str):
+        timestamp_col (str):
 
-# TODO add keys to not lag
-def enrich_with_lag_information(df, timestamp_col, subject_col, lags=None, verbose=False):
+    Returns:
+        tuple: (order, codes, position, remaining) arrays in sorted order: the original position of each row,
+            its subject code (-1 for missing subjects), the number of rows before it and after it in its subject
     """
+    codes, _ = pd.factorize(df[subject_col])
+    order = np.lexsort((df[timestamp_col].values, codes))
+    codes = codes[order]
+    new_group = np.ones(len(codes), dtype=bool)
+    new_group[1:] = codes[1:] != codes[:-1]
+    starts = np.flatnonzero(new_group)
+    sizes = np.diff(np.append(starts, len(codes)))
+    position = np.arange(len(codes)) - np.repeat(starts, sizes)
+    remaining = np.repeat(sizes, sizes) - 1 - position
+    return order, codes, position, remaining
+
+
+def enrich_with_lag_information(df, timestamp_col, subject_col, lags=None, exclude_cols=None, drop_incomplete=True,
+                                verbose=False):
+    """Add, for each subject, the values of the previous rows in time as new columns named '{col}_LAG_{lag}'.
+    The frame is sorted only once, all the lags are shifted on it and then put back in the original row order.
 
     Args:
         df (DataFrame):
-        lags (list[int]): list of int to shift
+        timestamp_col (str):
+        subject_col (str):
+        lags (list[int]): list of int to shift, negative lags look at the following rows
+        exclude_cols (list[str]|None): columns not to lag, besides the timestamp and the subject
+        drop_incomplete (bool): drop the rows without enough rows of the same subject to fill all the lags,
+            and the rows without subject
         verbose (bool):
 
     Returns:
-        DataFrame:
+        DataFrame: the original rows, with a new index, followed by the lag columns
     """
     if lags is None:
         lags = [1]
 
     assert len(lags) > 0, "No lags requested ({}), what do you want from me?".format(lags)
 
-    df_copy = pd.DataFrame(df.copy())
-    df_with_target_sorted = df_copy.sort_values(by=[subject_col, timestamp_col])
+    exclude_cols = set([timestamp_col, subject_col] + list(exclude_cols or []))
+    lag_cols = [col for col in df.columns if col not in exclude_cols]
+
+    order, codes, position, remaining = _sorted_groups(df, subject_col, timestamp_col)
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+    grouped = df[lag_cols].take(order).groupby(np.where(codes >= 0, codes, np.nan), sort=False)
 
-    lag_result = {}
+    df_final = df.copy(deep=False)
     for lag in lags:
-        lag_result[lag] = pd.DataFrame(pd.concat([
-                                                     group
-                                                 .set_index(timestamp_col)
-                                                 .shift(lag)
-                                                 .reset_index() for name, group in
-                                                     df_with_target_sorted.groupby(subject_col)
-                                                     ])).rename(
-            columns=lambda x: x + '_LAG_{}'.format(lag) if x not in [timestamp_col, subject_col] else x,
-            inplace=False)
+        shifted = grouped.shift(lag).take(inverse)
+        for col in lag_cols:
+            df_final['{}_LAG_{}'.format(col, lag)] = shifted[col].values
+
+    if drop_incomplete:
+        complete = (codes >= 0) & (position >= max(max(lags), 0)) & (remaining >= max(-min(lags), 0))
+        df_final = df_final[complete[inverse]]
+    df_final = df_final.reset_index(drop=True)
 
     if verbose:
-        for k, v in lag_result.items():
-            print("Lag", k)
-            print(v.info(memory_usage='deep', verbose=False), "\n")
-        print("")
+        print(df_final.info(memory_usage='deep', verbose=False), "\n")
+
+    return df_final
 
-    # Merge all the lags
-    df_final = join_multiple(df_copy, lag_result.values(), on=[subject_col, timestamp_col])
 
-    # Remove useless columns
-    useful_columns_raw = list(set(df_final.columns.tolist()))
+def _delta_label(delta):
+    """Label of a time delta for the feature names: strings are kept as given, e.g. '15min'."""
+    if isinstance(delta, str):
+        return delta
+    from pandas.tseries.frequencies import to_offset
+    label = to_offset(pd.Timedelta(delta)).freqstr
+    return label if label[0].isdigit() else '1' + label
 
-    useful_columns = [x for x in useful_columns_raw
-                      if not all(sub in x for sub in [subject_col, 'LAG'])
-                      and not all(sub in x for sub in [timestamp_col, 'LAG'])
-                      # and not all(sub in x for sub in [MONTH, 'LAG'])
-                      # and not all(sub in x for sub in [WEEKEND, 'LAG'])
-                      # and not all(sub in x for sub in [WEEKDAY, 'LAG'])
-                      # and not all(sub in x for sub in [WEEK, 'LAG'])
-                      # and not all(sub in x for sub in [HOUR, 'LAG'])
-                      # and not all(sub in x for sub in ['MINUTE', 'LAG'])
-                      # and not all(sub in x for sub in ['TARGET', 'LAG'])
-                      ]
 
-    return df_final[useful_columns]
+def enrich_with_time_window_information(df, timestamp_col, subject_col, lags=None, windows=None, aggs=None,
+                                        value_cols=None, tolerance=None, dtype='float32', verbose=False):
+    """Add, for each subject, time based lags and rolling aggregates of the value columns.
+
+    A time lag is the last value of the same subject at least lag before the row, also with irregular sampling,
+    named '{col}_LAG_{lag}'. A rolling aggregate is computed over the rows of the same subject in the time window
+    ending at the row (included), named '{col}_ROLLING_{AGG}_{window}'. The frame is sorted only once by subject
+    and timestamp: lags are found with a searchsorted on the sorted keys, rolling aggregates with grouped rolling
+    windows, and all the features are put back in the original row order.
+
+    Args:
+        df (DataFrame):
+        timestamp_col (str):
+        subject_col (str):
+        lags (list[str|timedelta]|None): time lags, e.g. ['15min', timedelta(hours=1)]
+        windows (list[str|timedelta]|None): time windows of the rolling aggregates, e.g. ['1h']
+        aggs (list[str]|None): rolling aggregates among 'mean', 'max', 'min', 'sum', 'count', 'std', default mean
+        value_cols (list[str]|None): columns to enrich, default all the numeric columns but the subject
+        tolerance (str|timedelta|None): maximum age of a lagged value, older values are left missing
+        dtype (str|None): dtype of the new columns, None to keep the ones computed by pandas
+        verbose (bool):
+
+    Returns:
+        DataFrame: the original frame followed by the new columns, in the same row order
+    """
+    lags = list(lags or [])
+    windows = list(windows or [])
+    aggs = list(aggs or ['mean'])
+    if not lags and not windows:
+        raise ValueError("No lags nor windows requested, what do you want from me?")
+    for agg in aggs:
+        if agg not in ('mean', 'max', 'min', 'sum', 'count', 'std'):
+            raise ValueError("Rolling aggregate '{}' not supported".format(agg))
+    if value_cols is None:
+        value_cols = [col for col in df.select_dtypes(include=['number', 'bool']).columns
+                      if col not in (timestamp_col, subject_col)]
+
+    order, codes, _, _ = _sorted_groups(df, subject_col, timestamp_col)
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+    timestamps = df[timestamp_col].values.astype('datetime64[ns]').take(order)
+    values = df[value_cols].take(order).reset_index(drop=True)
+    features = {}
+
+    if lags:
+        # Keys increasing along the sorted rows: subject code and dense rank of the timestamp
+        unique_ts = np.sort(timestamps)
+        first_of_run = np.ones(len(unique_ts), dtype=bool)
+        first_of_run[1:] = unique_ts[1:] != unique_ts[:-1]
+        unique_ts = unique_ts[first_of_run]
+        n_ranks = len(unique_ts) + 1
+        keys = codes * n_ranks + np.searchsorted(unique_ts, timestamps)
+        for lag in lags:
+            targets = timestamps - np.timedelta64(pd.Timedelta(lag).value, 'ns')
+            target_keys = codes * n_ranks + np.searchsorted(unique_ts, targets, side='right') - 1
+            position = np.searchsorted(keys, target_keys, side='right') - 1
+            found = (codes >= 0) & (position >= 0)
+            found[found] = codes[position[found]] == codes[found]
+            if tolerance is not None:
+                limit = targets - np.timedelta64(pd.Timedelta(tolerance).value, 'ns')
+                found[found] = timestamps[position[found]] >= limit[found]
+            lagged = values.take(np.where(found, position, 0))
+            for col in value_cols:
+                features['{}_LAG_{}'.format(col, _delta_label(lag))] = lagged[col].where(found).values
+
+    if windows:
+        frame = values.assign(**{timestamp_col: timestamps})
+        grouped = frame.groupby(np.where(codes >= 0, codes, np.nan), sort=False)
+        for window in windows:
+            rolling = grouped.rolling(pd.Timedelta(window), on=timestamp_col)
+            for agg in aggs:
+                aggregated = getattr(rolling, agg)()
+                # Rows without subject are not in any group
+                aggregated = aggregated.set_index(aggregated.index.get_level_values(-1)).reindex(frame.index)
+                for col in value_cols:
+                    name = '{}_ROLLING_{}_{}'.format(col, agg.upper(), _delta_label(window))
+                    features[name] = aggregated[col].values
+
+    df_final = df.copy(deep=False)
+    for name, feature in features.items():
+        feature = feature[inverse]
+        df_final[name] = feature if dtype is None else feature.astype(dtype)
+
+    if verbose:
+        print(df_final.info(memory_usage='deep', verbose=False), "\n")
+
+    return df_final
 
 
 def add_target(df, timestamp_col, subject_col, delta, target_col='STOP_TYPE_PRESENCE_230', verbose=False):
@@ -215,6 +652,7 @@ def under_sampling(train, target=None, frac=0.66, target_to_under_sample=0, verb
     Returns:
         DataFrame
     """
+    from sklearn.utils import shuffle
     if target is None:
         targets_possible = [x for x in train.columns if 'TARGET' in x]
         if len(targets_possible) != 1:
@@ -1,6 +1,5 @@
 import itertools
 import numpy as np
-import matplotlib.pyplot as plt
 
 
 # TODO unittest
@@ -58,11 +57,15 @@ def from_rgb_to_hex(rgb_tuple):
 
 
 def plot_confusion_matrix(cm, classes, normalize=False, title="",
-                          cmap=plt.cm.Blues, cluster_names=None):
+                          cmap=None, cluster_names=None):
     """
     This function prints and plots the confusion matrix.
     Normalization can be applied by setting `normalize=True`.
+    The colormap defaults to plt.cm.Blues.
     """
+    import matplotlib.pyplot as plt
+    if cmap is None:
+        cmap = plt.cm.Blues
     if cluster_names is None:
         cluster_names = ['First', 'Second']
     accuracy = sum(cm.diagonal()) / sum([sum(row) for row in cm])
@@ -0,0 +1,106 @@
+import unittest
+
+import pandas as pd
+
+from giammis.utils.gdatetime import (covered_seconds_per_time_unit, floor_datetime_array, floor_datetime_calendar,
+                                     round_datetime_array)
+
+TZ = 'Europe/Rome'
+
+
+def utc_range(start, end, freq):
+    return pd.date_range(start, end, freq=freq, tz='UTC').tz_convert(TZ)
+
+
+class BucketingDstTest(unittest.TestCase):
+    def test_floor_hour_on_fold(self):
+        # On 2017-10-29 local time goes from 03:00 CEST back to 02:00 CET
+        dates = utc_range('2017-10-28 22:00', '2017-10-29 03:00', '10min')
+        result = floor_datetime_array(dates, 60 * 60)
+        self.assertTrue(((dates - result) >= pd.Timedelta(0)).all())
+        self.assertTrue(((dates - result) < pd.Timedelta(hours=1)).all())
+        self.assertTrue((result.minute == 0).all())
+        # Both 02:xx hours are there, each one with its own offset
+        self.assertEqual(len(result.unique()), 6)
+        pass
+
+    def test_floor_on_fold_keeps_offset(self):
+        date = pd.Timestamp('2017-10-29 01:30', tz='UTC').tz_convert(TZ)
+        self.assertEqual(date.utcoffset(), pd.Timedelta(hours=1))
+        result = floor_datetime_array(pd.Series([date]), 60 * 60)[0]
+        self.assertEqual(result, pd.Timestamp('2017-10-29 01:00', tz='UTC'))
+        result = round_datetime_array(pd.Series([date]), 60 * 60)[0]
+        self.assertEqual(result, pd.Timestamp('2017-10-29 02:00', tz='UTC'))
+        pass
+
+    def test_floor_changing_offset(self):
+        # The day started in CEST, the date is in CET
+        date = pd.Timestamp('2017-10-29 10:00', tz=TZ)
+        result = floor_datetime_array(pd.DatetimeIndex([date]), 60 * 60 * 24)[0]
+        self.assertEqual(result, pd.Timestamp('2017-10-29 00:00', tz=TZ))
+        self.assertEqual(result.utcoffset(), pd.Timedelta(hours=2))
+        result = floor_datetime_calendar(pd.DatetimeIndex([date]), 'day')[0]
+        self.assertEqual(result, pd.Timestamp('2017-10-29 00:00', tz=TZ))
+        pass
+
+    def test_floor_on_gap(self):
+        # On 2017-03-26 local time jumps from 02:00 CET to 03:00 CEST: 02:00 does not exist
+        dates = pd.DatetimeIndex([pd.Timestamp('2017-03-26 03:10', tz=TZ)])
+        result = floor_datetime_array(dates, 60 * 60 * 2)
+        self.assertEqual(result[0], pd.Timestamp('2017-03-26 03:00', tz=TZ))
+        result = floor_datetime_array(dates, 60 * 60 * 2, nonexistent='NaT')
+        self.assertTrue(pd.isnull(result[0]))
+        with self.assertRaises(Exception):
+            floor_datetime_array(dates, 60 * 60 * 2, nonexistent='raise')
+        pass
+
+    def test_floor_hour_on_gap(self):
+        dates = utc_range('2017-03-25 22:00', '2017-03-26 03:00', '10min')
+        result = floor_datetime_array(dates, 60 * 60)
+        self.assertTrue(((dates - result) >= pd.Timedelta(0)).all())
+        self.assertTrue(((dates - result) < pd.Timedelta(hours=1)).all())
+        self.assertTrue((result.minute == 0).all())
+        pass
+
+    def test_utc_bucketing(self):
+        dates = pd.Series(pd.date_range('2017-01-01 10:10', periods=10, freq='17min', tz='Asia/Kolkata'))
+        result = floor_datetime_array(dates, 60 * 60)
+        self.assertTrue((result.dt.minute == 0).all())
+        result = floor_datetime_array(dates, 60 * 60, utc=True)
+        self.assertTrue((result.dt.minute == 30).all())
+        self.assertEqual(str(result.dt.tz), 'Asia/Kolkata')
+        self.assertTrue((result.dt.tz_convert('UTC').dt.minute == 0).all())
+        pass
+
+    def test_covered_seconds_on_fold(self):
+        starts = pd.Series([pd.Timestamp('2021-10-31 00:30', tz='UTC').tz_convert(TZ)])
+        ends = pd.Series([pd.Timestamp('2021-10-31 01:30', tz='UTC').tz_convert(TZ)])
+        time_unit, seconds = covered_seconds_per_time_unit(starts, ends, 60 * 60)
+        # Both 02:00 hours get their own unit
+        self.assertEqual(list(time_unit), [pd.Timestamp('2021-10-31 00:00', tz='UTC'),
+                                           pd.Timestamp('2021-10-31 01:00', tz='UTC')])
+        self.assertEqual(seconds.tolist(), [30 * 60, 30 * 60])
+        pass
+
+    def test_covered_seconds_on_gap(self):
+        starts = pd.Series([pd.Timestamp('2021-03-28 01:30', tz=TZ)])
+        ends = pd.Series([pd.Timestamp('2021-03-28 03:30', tz=TZ)])
+        time_unit, seconds = covered_seconds_per_time_unit(starts, ends, 60 * 60)
+        self.assertEqual(list(time_unit), [pd.Timestamp('2021-03-28 01:00', tz=TZ),
+                                           pd.Timestamp('2021-03-28 03:00', tz=TZ)])
+        self.assertEqual(seconds.tolist(), [30 * 60, 30 * 60])
+        pass
+
+    def test_covered_seconds_per_day_across_dst(self):
+        starts = pd.DatetimeIndex([pd.Timestamp('2021-10-30 12:00', tz=TZ), pd.Timestamp('2021-03-27 12:00', tz=TZ)])
+        ends = pd.DatetimeIndex([pd.Timestamp('2021-11-01 12:00', tz=TZ), pd.Timestamp('2021-03-29 12:00', tz=TZ)])
+        time_unit, seconds = covered_seconds_per_time_unit(starts, ends, 60 * 60 * 24)
+        self.assertTrue((time_unit.hour == 0).all())
+        self.assertEqual(seconds.sum(), 2 * 48 * 60 * 60)
+        self.assertEqual(seconds[time_unit == pd.Timestamp('2021-10-31', tz=TZ)].tolist(), [25 * 60 * 60])
+        self.assertEqual(seconds[time_unit == pd.Timestamp('2021-03-28', tz=TZ)].tolist(), [23 * 60 * 60])
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
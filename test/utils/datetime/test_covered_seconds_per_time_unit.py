@@ -0,0 +1,70 @@
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from giammis.utils.gdatetime import covered_seconds_per_time_unit, sum_intervals
+from test.utils.random_data import random_interval_arrays
+
+INTERVALS_OVER_THREE_DAYS = {'span_seconds': 60 * 60 * 24 * 3, 'max_duration_seconds': 60 * 60 * 5}
+
+
+class CoveredSecondsPerTimeUnitTest(unittest.TestCase):
+    def test_single_interval(self):
+        starts = np.array([datetime(2017, 10, 1, 10, 20)], dtype='datetime64[ns]')
+        ends = np.array([datetime(2017, 10, 1, 12, 10)], dtype='datetime64[ns]')
+        time_unit, seconds = covered_seconds_per_time_unit(starts, ends, 60 * 60)
+        expected_units = np.array([datetime(2017, 10, 1, h) for h in [10, 11, 12]], dtype='datetime64[ns]')
+        np.testing.assert_array_equal(time_unit, expected_units)
+        self.assertEqual(seconds.tolist(), [40 * 60, 60 * 60, 10 * 60])
+        pass
+
+    def test_inside_single_unit_and_edges(self):
+        starts = np.array([datetime(2017, 10, 1, 10, 20), datetime(2017, 10, 1, 12)], dtype='datetime64[ns]')
+        ends = np.array([datetime(2017, 10, 1, 10, 30), datetime(2017, 10, 1, 13)], dtype='datetime64[ns]')
+        time_unit, seconds = covered_seconds_per_time_unit(starts, ends, 60 * 60)
+        self.assertEqual(len(time_unit), 3)
+        self.assertEqual(seconds.tolist(), [10 * 60, 0, 60 * 60])
+        pass
+
+    def test_union_and_raw_sum(self):
+        starts = np.array([datetime(2017, 10, 1, 10), datetime(2017, 10, 1, 10, 30)], dtype='datetime64[ns]')
+        ends = np.array([datetime(2017, 10, 1, 11), datetime(2017, 10, 1, 11)], dtype='datetime64[ns]')
+        _, seconds = covered_seconds_per_time_unit(starts, ends, 60 * 60)
+        self.assertEqual(seconds.tolist(), [60 * 60])
+        _, seconds = covered_seconds_per_time_unit(starts, ends, 60 * 60, union=False)
+        self.assertEqual(seconds.tolist(), [90 * 60])
+        pass
+
+    def test_total_same_as_sum_intervals(self):
+        starts, ends = random_interval_arrays(1000, **INTERVALS_OVER_THREE_DAYS)
+        for delta_seconds in [60, 60 * 15, 60 * 60, 60 * 60 * 24]:
+            time_unit, seconds = covered_seconds_per_time_unit(starts, ends, delta_seconds)
+            self.assertEqual(seconds.sum(), sum_intervals(start_dates=starts, end_dates=ends))
+            self.assertTrue((seconds <= delta_seconds).all())
+            _, seconds = covered_seconds_per_time_unit(starts, ends, delta_seconds, union=False)
+            self.assertEqual(seconds.sum(), (ends - starts).sum() / np.timedelta64(1, 's'))
+        pass
+
+    def test_same_as_intersection_per_unit(self):
+        starts, ends = random_interval_arrays(200, seed=7, **INTERVALS_OVER_THREE_DAYS)
+        delta = timedelta(hours=1)
+        time_unit, seconds = covered_seconds_per_time_unit(starts, ends, delta.total_seconds())
+        for unit, covered in zip(time_unit[::7], seconds[::7]):
+            unit = unit.astype('datetime64[us]').item()
+            clipped = [(max(s, unit), min(e, unit + delta))
+                       for s, e in zip(starts.astype('datetime64[us]').tolist(), ends.astype('datetime64[us]').tolist())
+                       if s < unit + delta and e > unit]
+            self.assertEqual(covered, sum_intervals(clipped, engine='python'))
+        pass
+
+    def test_empty(self):
+        empty = np.array([], dtype='datetime64[ns]')
+        time_unit, seconds = covered_seconds_per_time_unit(empty, empty, 60)
+        self.assertEqual(len(time_unit), 0)
+        self.assertEqual(len(seconds), 0)
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
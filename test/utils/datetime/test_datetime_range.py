@@ -0,0 +1,79 @@
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from giammis.utils.gdatetime import DatetimeRange, range_datetime
+
+
+class DatetimeRangeTest(unittest.TestCase):
+    def test_same_as_range_datetime(self):
+        start = datetime(2017, 1, 1)
+        for end in [datetime(2017, 1, 1), datetime(2016, 1, 1), datetime(2017, 1, 2), datetime(2017, 1, 2, 0, 30)]:
+            for delta in [timedelta(hours=1), timedelta(minutes=7), timedelta(seconds=1)]:
+                space = DatetimeRange(start, end, delta)
+                expected = range_datetime(start, end, delta)
+                self.assertEqual(len(space), len(expected))
+                self.assertEqual(list(space), expected)
+                self.assertEqual(space, expected)
+        pass
+
+    def test_lazy_range_datetime(self):
+        start = datetime(2017, 1, 1)
+        end = datetime(2018, 1, 1)
+        space = range_datetime(start, end, timedelta(seconds=1), lazy=True)
+        self.assertIsInstance(space, DatetimeRange)
+        self.assertEqual(len(space), 365 * 24 * 60 * 60)
+        pass
+
+    def test_indexing(self):
+        space = DatetimeRange(datetime(2017, 1, 1), datetime(2017, 1, 2), timedelta(hours=1))
+        self.assertEqual(space[0], datetime(2017, 1, 1))
+        self.assertEqual(space[5], datetime(2017, 1, 1, 5))
+        self.assertEqual(space[-1], datetime(2017, 1, 1, 23))
+        with self.assertRaises(IndexError):
+            space[24]
+        with self.assertRaises(IndexError):
+            space[-25]
+        pass
+
+    def test_slicing(self):
+        start = datetime(2017, 1, 1)
+        end = datetime(2017, 1, 2)
+        delta = timedelta(hours=1)
+        space = DatetimeRange(start, end, delta)
+        expected = range_datetime(start, end, delta)
+        for item in [slice(None), slice(2, 10), slice(2, 10, 3), slice(-5, None), slice(10, 2), slice(None, None, -2)]:
+            self.assertEqual(list(space[item]), expected[item])
+        self.assertIsInstance(space[2:10:3], DatetimeRange)
+        pass
+
+    def test_contains_and_index(self):
+        space = DatetimeRange(datetime(2017, 1, 1), datetime(2017, 1, 2), timedelta(minutes=15))
+        self.assertIn(datetime(2017, 1, 1, 10, 45), space)
+        self.assertNotIn(datetime(2017, 1, 1, 10, 44), space)
+        self.assertNotIn(datetime(2017, 1, 2), space)
+        self.assertNotIn(datetime(2016, 12, 31, 23, 45), space)
+        self.assertNotIn('2017-01-01', space)
+        self.assertEqual(space.index(datetime(2017, 1, 1, 10, 45)), 43)
+        with self.assertRaises(ValueError):
+            space.index(datetime(2017, 1, 1, 10, 44))
+        pass
+
+    def test_to_numpy(self):
+        start = datetime(2017, 1, 1)
+        end = datetime(2017, 1, 3)
+        delta = timedelta(minutes=7)
+        result = DatetimeRange(start, end, delta).to_numpy()
+        expected = np.array(range_datetime(start, end, delta), dtype='datetime64[ns]')
+        np.testing.assert_array_equal(result, expected)
+        pass
+
+    def test_not_positive_delta(self):
+        with self.assertRaises(ValueError):
+            DatetimeRange(datetime(2017, 1, 1), datetime(2017, 1, 2), timedelta(0))
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
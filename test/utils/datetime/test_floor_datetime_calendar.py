@@ -0,0 +1,112 @@
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from giammis.utils.gdatetime import floor_datetime_calendar, range_datetime_calendar
+from test.utils.random_data import random_dates
+
+DATES_OVER_THIRTY_YEARS = {'start': datetime(1995, 1, 1), 'span_seconds': 60 * 60 * 24 * 365 * 30}
+
+
+class FloorDatetimeCalendarTest(unittest.TestCase):
+    def test_same_as_python_calendar(self):
+        dates = random_dates(2000, **DATES_OVER_THIRTY_YEARS)
+        array = np.array(dates, dtype='datetime64[ns]')
+        expected = {
+            'day': [datetime(d.year, d.month, d.day) for d in dates],
+            'week': [datetime(d.year, d.month, d.day) - timedelta(days=d.weekday()) for d in dates],
+            'month': [datetime(d.year, d.month, 1) for d in dates],
+            'quarter': [datetime(d.year, (d.month - 1) // 3 * 3 + 1, 1) for d in dates],
+            'year': [datetime(d.year, 1, 1) for d in dates],
+        }
+        for unit, expected_dates in expected.items():
+            result = floor_datetime_calendar(array, unit)
+            np.testing.assert_array_equal(result, np.array(expected_dates, dtype='datetime64[ns]'), err_msg=unit)
+        pass
+
+    def test_iso_week(self):
+        dates = pd.Series(random_dates(2000, **DATES_OVER_THIRTY_YEARS))
+        result = floor_datetime_calendar(dates, 'week')
+        self.assertTrue((result.dt.weekday == 0).all())
+        self.assertTrue((dates.dt.isocalendar().week == result.dt.isocalendar().week).all())
+        self.assertTrue((dates - result < pd.Timedelta(days=7)).all())
+        pass
+
+    def test_week_start(self):
+        dates = random_dates(500, **DATES_OVER_THIRTY_YEARS)
+        array = np.array(dates, dtype='datetime64[ns]')
+        for week_start in range(7):
+            result = floor_datetime_calendar(array, 'week', week_start=week_start)
+            expected = [datetime(d.year, d.month, d.day) - timedelta(days=(d.weekday() - week_start) % 7)
+                        for d in dates]
+            np.testing.assert_array_equal(result, np.array(expected, dtype='datetime64[ns]'))
+        pass
+
+    def test_business_day(self):
+        dates = pd.Series([datetime(2017, 12, 22, 10), datetime(2017, 12, 23, 10), datetime(2017, 12, 25, 10),
+                           datetime(2017, 12, 26, 10), datetime(2017, 12, 27, 10), None])
+        result = floor_datetime_calendar(dates, 'business_day')
+        expected = [datetime(2017, 12, 22), datetime(2017, 12, 22), datetime(2017, 12, 25), datetime(2017, 12, 26),
+                    datetime(2017, 12, 27)]
+        self.assertEqual(result[:5].tolist(), expected)
+        self.assertTrue(pd.isnull(result[5]))
+        result = floor_datetime_calendar(dates, 'business_day', holidays=['2017-12-25', '2017-12-26'])
+        expected = [datetime(2017, 12, 22), datetime(2017, 12, 22), datetime(2017, 12, 22), datetime(2017, 12, 22),
+                    datetime(2017, 12, 27)]
+        self.assertEqual(result[:5].tolist(), expected)
+        pass
+
+    def test_tz_aware(self):
+        dates = pd.Series([datetime(2017, 10, 31, 23, 30)]).dt.tz_localize('Europe/Rome')
+        result = floor_datetime_calendar(dates, 'month')
+        self.assertEqual(result[0], pd.Timestamp('2017-10-01').tz_localize('Europe/Rome'))
+        pass
+
+    def test_wrong_unit(self):
+        with self.assertRaises(ValueError):
+            floor_datetime_calendar(np.array(['2017-01-01'], dtype='datetime64[ns]'), 'fortnight')
+        pass
+
+
+class RangeDatetimeCalendarTest(unittest.TestCase):
+    def test_months(self):
+        result = range_datetime_calendar(datetime(2017, 11, 15), datetime(2018, 3, 1), 'month')
+        expected = np.array(['2017-11-01', '2017-12-01', '2018-01-01', '2018-02-01'], dtype='datetime64[ns]')
+        np.testing.assert_array_equal(result, expected)
+        pass
+
+    def test_quarters_and_years(self):
+        result = range_datetime_calendar(datetime(2017, 11, 15), datetime(2018, 4, 1, 1), 'quarter')
+        expected = np.array(['2017-10-01', '2018-01-01', '2018-04-01'], dtype='datetime64[ns]')
+        np.testing.assert_array_equal(result, expected)
+        result = range_datetime_calendar(datetime(2017, 11, 15), datetime(2019, 1, 1), 'year')
+        expected = np.array(['2017-01-01', '2018-01-01'], dtype='datetime64[ns]')
+        np.testing.assert_array_equal(result, expected)
+        pass
+
+    def test_weeks(self):
+        result = range_datetime_calendar(datetime(2017, 11, 15), datetime(2017, 12, 4), 'week')
+        expected = np.array(['2017-11-13', '2017-11-20', '2017-11-27'], dtype='datetime64[ns]')
+        np.testing.assert_array_equal(result, expected)
+        result = range_datetime_calendar(datetime(2017, 11, 15), datetime(2017, 12, 4), 'week', week_start=6)
+        expected = np.array(['2017-11-12', '2017-11-19', '2017-11-26', '2017-12-03'], dtype='datetime64[ns]')
+        np.testing.assert_array_equal(result, expected)
+        pass
+
+    def test_business_days(self):
+        result = range_datetime_calendar(datetime(2017, 12, 21), datetime(2017, 12, 28), 'business_day',
+                                         holidays=[datetime(2017, 12, 25), datetime(2017, 12, 26)])
+        expected = np.array(['2017-12-21', '2017-12-22', '2017-12-27'], dtype='datetime64[ns]')
+        np.testing.assert_array_equal(result, expected)
+        pass
+
+    def test_empty(self):
+        result = range_datetime_calendar(datetime(2017, 12, 1), datetime(2017, 12, 1), 'month')
+        self.assertEqual(len(result), 0)
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
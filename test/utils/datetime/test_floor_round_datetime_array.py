@@ -0,0 +1,78 @@
+import time
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from giammis.utils.gdatetime import floor_datetime, floor_datetime_array, round_datetime, round_datetime_array
+from test.utils.random_data import random_dates
+
+ROUND_TO_VALUES = [1, 7, 60, 60 * 15, 60 * 60, 60 * 60 * 5, 60 * 60 * 8, 60 * 60 * 24]
+
+
+class FloorRoundDatetimeArrayTest(unittest.TestCase):
+    def test_numpy_same_as_scalar(self):
+        dates = random_dates(1000, microseconds=True)
+        array = np.array(dates, dtype='datetime64[ns]')
+        for round_to in ROUND_TO_VALUES:
+            result = floor_datetime_array(array, round_to)
+            expected = np.array([floor_datetime(d, round_to) for d in dates], dtype='datetime64[ns]')
+            np.testing.assert_array_equal(result, expected)
+            result = round_datetime_array(array, round_to)
+            expected = np.array([round_datetime(d, round_to) for d in dates], dtype='datetime64[ns]')
+            np.testing.assert_array_equal(result, expected)
+        pass
+
+    def test_series_same_as_scalar(self):
+        dates = random_dates(1000, microseconds=True)
+        series = pd.Series(dates, index=range(100, 1100), name='ts')
+        for round_to in ROUND_TO_VALUES:
+            result = floor_datetime_array(series, round_to)
+            self.assertIsInstance(result, pd.Series)
+            self.assertEqual(result.name, 'ts')
+            self.assertEqual(result.index.tolist(), series.index.tolist())
+            self.assertEqual(result.tolist(), [floor_datetime(d, round_to) for d in dates])
+            result = round_datetime_array(series, round_to)
+            self.assertEqual(result.tolist(), [round_datetime(d, round_to) for d in dates])
+        pass
+
+    def test_datetime_index(self):
+        dates = random_dates(100, microseconds=True)
+        result = floor_datetime_array(pd.DatetimeIndex(dates), 60)
+        self.assertIsInstance(result, pd.DatetimeIndex)
+        self.assertEqual(result.tolist(), [floor_datetime(d, 60) for d in dates])
+        pass
+
+    def test_tz_aware_series(self):
+        dates = random_dates(1000, microseconds=True)
+        series = pd.Series(dates).dt.tz_localize('Europe/Rome', ambiguous='NaT', nonexistent='NaT').dropna()
+        for round_to in [60, 60 * 60, 60 * 60 * 8]:
+            result = floor_datetime_array(series, round_to)
+            self.assertEqual(str(result.dt.tz), 'Europe/Rome')
+            expected = [floor_datetime(d.to_pydatetime(), round_to).replace(tzinfo=None) for d in series]
+            self.assertEqual(result.dt.tz_localize(None).tolist(), expected)
+        pass
+
+    def test_missing_dates(self):
+        series = pd.Series([datetime(2017, 1, 1, 10, 20), None])
+        result = floor_datetime_array(series, 60 * 60)
+        self.assertEqual(result[0], datetime(2017, 1, 1, 10))
+        self.assertTrue(pd.isnull(result[1]))
+        pass
+
+    def test_faster_than_scalar(self):
+        dates = random_dates(20000, microseconds=True)
+        array = np.array(dates, dtype='datetime64[ns]')
+        start = time.time()
+        [floor_datetime(d, 60 * 15) for d in dates]
+        scalar_time = time.time() - start
+        start = time.time()
+        floor_datetime_array(array, 60 * 15)
+        array_time = time.time() - start
+        self.assertLess(array_time, scalar_time)
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
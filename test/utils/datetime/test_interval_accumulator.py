@@ -0,0 +1,67 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+
+from giammis.utils.gdatetime import IntervalAccumulator, sum_intervals
+
+
+class IntervalAccumulatorTest(unittest.TestCase):
+    def test_in_order(self):
+        start_date = datetime(2017, 10, 1)
+        accumulator = IntervalAccumulator()
+        intervals = []
+        for minute in range(0, 600, 7):
+            interval = (start_date + timedelta(minutes=minute), start_date + timedelta(minutes=minute + 10))
+            intervals.append(interval)
+            accumulator.add(*interval)
+            self.assertEqual(accumulator.total_seconds(), sum_intervals(intervals))
+        pass
+
+    def test_out_of_order_within_lateness(self):
+        rnd = random.Random(42)
+        start_date = datetime(2017, 10, 1)
+        lateness = timedelta(minutes=30)
+        intervals = []
+        for minute in range(0, 24 * 60, 5):
+            jitter = rnd.randint(0, 25)
+            interval_start = start_date + timedelta(minutes=minute + jitter)
+            intervals.append((interval_start, interval_start + timedelta(minutes=rnd.randint(0, 15))))
+        accumulator = IntervalAccumulator(lateness=lateness)
+        for i, interval in enumerate(intervals):
+            accumulator.add(*interval)
+            self.assertEqual(accumulator.total_seconds(), sum_intervals(intervals[:i + 1]))
+        pass
+
+    def test_closed_intervals_leave_the_frontier(self):
+        start_date = datetime(2017, 10, 1)
+        accumulator = IntervalAccumulator(lateness=timedelta(hours=1))
+        for hour in range(24):
+            accumulator.add(start_date + timedelta(hours=hour), start_date + timedelta(hours=hour, minutes=30))
+        self.assertEqual(len(accumulator.open_intervals()), 2)
+        self.assertEqual(accumulator.total_seconds(), 24 * 30 * 60)
+        pass
+
+    def test_merging_in_frontier(self):
+        start_date = datetime(2017, 10, 1)
+        accumulator = IntervalAccumulator(lateness=timedelta(hours=10))
+        accumulator.extend([(start_date + timedelta(hours=4), start_date + timedelta(hours=5)),
+                            (start_date, start_date + timedelta(hours=1)),
+                            (start_date + timedelta(hours=2), start_date + timedelta(hours=3)),
+                            (start_date + timedelta(minutes=30), start_date + timedelta(hours=4))])
+        expected = [(start_date, start_date + timedelta(hours=5))]
+        self.assertEqual(accumulator.open_intervals(), expected)
+        self.assertEqual(accumulator.total_seconds(), 5 * 60 * 60)
+        pass
+
+    def test_too_late(self):
+        start_date = datetime(2017, 10, 1, 10)
+        accumulator = IntervalAccumulator(lateness=timedelta(minutes=10))
+        accumulator.add(start_date, start_date + timedelta(minutes=1))
+        accumulator.add(start_date - timedelta(minutes=10), start_date)
+        with self.assertRaises(ValueError):
+            accumulator.add(start_date - timedelta(minutes=11), start_date)
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from giammis.utils.gdatetime import IntervalSet, sum_intervals
+
+
+def day_hours(*hours):
+    return [(datetime(2017, 10, 1, start), datetime(2017, 10, 1, end)) for start, end in hours]
+
+
+class IntervalSetTest(unittest.TestCase):
+    def test_merge_on_creation(self):
+        interval_set = IntervalSet.from_intervals(day_hours((0, 2), (1, 3), (5, 6), (6, 7), (10, 11)))
+        self.assertEqual(len(interval_set), 3)
+        self.assertEqual(interval_set, IntervalSet.from_intervals(day_hours((10, 11), (5, 7), (0, 3))))
+        self.assertEqual(interval_set.total_seconds(), 60 * 60 * 6)
+        pass
+
+    def test_empty(self):
+        interval_set = IntervalSet()
+        self.assertEqual(len(interval_set), 0)
+        self.assertEqual(interval_set.total_seconds(), 0)
+        self.assertNotIn(datetime(2017, 10, 1), interval_set)
+        self.assertEqual(IntervalSet.from_intervals(day_hours((3, 3))), interval_set)
+        pass
+
+    def test_missing_and_inverted_intervals(self):
+        starts = np.array(['2017-10-01T00', 'NaT', '2017-10-01T05', '2017-10-01T08'], dtype='datetime64[ns]')
+        ends = np.array(['2017-10-01T02', '2017-10-01T03', 'NaT', '2017-10-01T07'], dtype='datetime64[ns]')
+        interval_set = IntervalSet(starts, ends)
+        self.assertEqual(interval_set, IntervalSet.from_intervals(day_hours((0, 2))))
+        self.assertEqual(sum_intervals(start_dates=starts, end_dates=ends), 60 * 60 * 2)
+        pass
+
+    def test_iteration(self):
+        interval_set = IntervalSet.from_intervals(day_hours((5, 6), (0, 2)))
+        result = [(start, end) for start, end in interval_set]
+        expected = [(np.datetime64('2017-10-01T00'), np.datetime64('2017-10-01T02')),
+                    (np.datetime64('2017-10-01T05'), np.datetime64('2017-10-01T06'))]
+        self.assertEqual(result, expected)
+        pass
+
+    def test_containment(self):
+        interval_set = IntervalSet.from_intervals(day_hours((0, 2), (5, 6)))
+        self.assertIn(datetime(2017, 10, 1, 0), interval_set)
+        self.assertIn(datetime(2017, 10, 1, 1, 59), interval_set)
+        self.assertNotIn(datetime(2017, 10, 1, 2), interval_set)
+        self.assertNotIn(datetime(2017, 9, 30, 23), interval_set)
+        dates = [datetime(2017, 10, 1, h, 30) for h in range(8)]
+        self.assertEqual(interval_set.locate(dates).tolist(), [0, 0, -1, -1, -1, 1, -1, -1])
+        self.assertEqual(interval_set.contains(dates).tolist(), [True, True, False, False, False, True, False, False])
+        pass
+
+    def test_union(self):
+        first = IntervalSet.from_intervals(day_hours((0, 2), (5, 6)))
+        second = IntervalSet.from_intervals(day_hours((1, 3), (6, 8), (10, 11)))
+        expected = IntervalSet.from_intervals(day_hours((0, 3), (5, 8), (10, 11)))
+        self.assertEqual(first.union(second), expected)
+        self.assertEqual(first | second, expected)
+        pass
+
+    def test_intersection(self):
+        stops = IntervalSet.from_intervals(day_hours((0, 2), (5, 9), (20, 23)))
+        shifts = IntervalSet.from_intervals(day_hours((1, 6), (8, 22)))
+        expected = IntervalSet.from_intervals(day_hours((1, 2), (5, 6), (8, 9), (20, 22)))
+        self.assertEqual(stops.intersection(shifts), expected)
+        self.assertEqual(stops & shifts, expected)
+        self.assertEqual(stops & IntervalSet(), IntervalSet())
+        pass
+
+    def test_difference(self):
+        stops = IntervalSet.from_intervals(day_hours((0, 10)))
+        pauses = IntervalSet.from_intervals(day_hours((2, 3), (5, 7), (9, 12)))
+        expected = IntervalSet.from_intervals(day_hours((0, 2), (3, 5), (7, 9)))
+        self.assertEqual(stops.difference(pauses), expected)
+        self.assertEqual(stops - pauses, expected)
+        self.assertEqual(pauses - pauses, IntervalSet())
+        pass
+
+    def test_same_as_sum_intervals(self):
+        start_date = datetime(1992, 1, 1)
+        intervals = [(start_date + timedelta(minutes=7 * i), start_date + timedelta(minutes=7 * i + (i % 13)))
+                     for i in range(500)]
+        result = IntervalSet.from_intervals(intervals).total_seconds()
+        expected = sum_intervals(intervals, engine='python')
+        self.assertEqual(result, expected)
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
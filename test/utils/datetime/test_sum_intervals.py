@@ -1,7 +1,11 @@
 import unittest
 from datetime import datetime, timedelta
 
+import numpy as np
+import pandas as pd
+
 from giammis.utils.gdatetime import sum_intervals
+from test.utils.random_data import random_intervals
 
 
 class SumIntervalsTest(unittest.TestCase):
@@ -78,6 +82,73 @@ class SumIntervalsTest(unittest.TestCase):
         self.assertEqual(result, expected)
         pass
 
+    def test_empty_intervals(self):
+        self.assertEqual(sum_intervals([]), 0)
+        self.assertEqual(sum_intervals([], engine='numpy'), 0)
+        self.assertEqual(sum_intervals(start_dates=[], end_dates=[]), 0)
+        pass
+
+    def test_numpy_engine_same_as_python(self):
+        for n in [1, 2, 10, 100, 1000]:
+            intervals = random_intervals(n, seed=n)
+            result = sum_intervals(intervals, engine='numpy')
+            expected = sum_intervals(intervals, engine='python')
+            self.assertEqual(result, expected)
+        pass
+
+    def test_generator_intervals(self):
+        intervals = random_intervals(100)
+        expected = sum_intervals(intervals, engine='python')
+        for engine in ['auto', 'python', 'numpy']:
+            result = sum_intervals((interval for interval in intervals), engine=engine)
+            self.assertEqual(result, expected)
+        pass
+
+    def test_numpy_engine_touching_intervals(self):
+        start_date = datetime(2017, 10, 1, 10)
+        middle_date = datetime(2017, 10, 1, 11)
+        end_date = datetime(2017, 10, 1, 12)
+        result = sum_intervals([(middle_date, end_date), (start_date, middle_date)], engine='numpy')
+        expected = 60 * 60 * 2
+        self.assertEqual(result, expected)
+        pass
+
+    def test_start_and_end_arrays(self):
+        intervals = random_intervals(500)
+        expected = sum_intervals(intervals, engine='python')
+        starts = np.array([interval[0] for interval in intervals], dtype='datetime64[ns]')
+        ends = np.array([interval[1] for interval in intervals], dtype='datetime64[ns]')
+        result = sum_intervals(start_dates=starts, end_dates=ends)
+        self.assertEqual(result, expected)
+        result = sum_intervals(start_dates=pd.Series(starts), end_dates=pd.Series(ends))
+        self.assertEqual(result, expected)
+        pass
+
+    def test_auto_engine_long_list(self):
+        intervals = random_intervals(20000)
+        result = sum_intervals(intervals)
+        expected = sum_intervals(intervals, engine='python')
+        self.assertEqual(result, expected)
+        pass
+
+    def test_tz_aware_series(self):
+        intervals = random_intervals(100)
+        starts = pd.Series([interval[0] for interval in intervals]).dt.tz_localize('Europe/Rome')
+        ends = pd.Series([interval[1] for interval in intervals]).dt.tz_localize('Europe/Rome')
+        result = sum_intervals(start_dates=starts, end_dates=ends)
+        expected = sum_intervals(intervals, engine='python')
+        self.assertEqual(result, expected)
+        pass
+
+    def test_wrong_arguments(self):
+        with self.assertRaises(ValueError):
+            sum_intervals()
+        with self.assertRaises(ValueError):
+            sum_intervals(start_dates=[datetime(2017, 1, 1)], end_dates=[])
+        with self.assertRaises(ValueError):
+            sum_intervals([], engine='fortran')
+        pass
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from giammis.utils.gdatetime import sum_intervals, sum_intervals_by
+from test.utils.random_data import random_intervals_frame
+
+
+class SumIntervalsByTest(unittest.TestCase):
+    def test_same_as_groupby_apply(self):
+        df = random_intervals_frame(2000, 30)
+        result = sum_intervals_by(df, 'machine', 'start', 'end')
+        for machine, group in df.groupby('machine'):
+            expected = sum_intervals(list(zip(group['start'], group['end'])), engine='python')
+            self.assertEqual(result[machine], expected)
+        self.assertEqual(len(result), df['machine'].nunique())
+        pass
+
+    def test_subjects_not_merged_together(self):
+        df = pd.DataFrame({
+            'machine': ['A', 'B', 'A'],
+            'start': [datetime(2017, 1, 1, 0), datetime(2017, 1, 1, 1), datetime(2017, 1, 1, 3)],
+            'end': [datetime(2017, 1, 1, 10), datetime(2017, 1, 1, 2), datetime(2017, 1, 1, 4)],
+        })
+        result = sum_intervals_by(df, 'machine', 'start', 'end')
+        self.assertEqual(result['A'], 60 * 60 * 10)
+        self.assertEqual(result['B'], 60 * 60)
+        pass
+
+    def test_missing_subjects_are_skipped(self):
+        df = pd.DataFrame({
+            'machine': ['A', None],
+            'start': [datetime(2017, 1, 1, 0), datetime(2017, 1, 1, 1)],
+            'end': [datetime(2017, 1, 1, 1), datetime(2017, 1, 1, 2)],
+        })
+        result = sum_intervals_by(df, 'machine', 'start', 'end')
+        self.assertEqual(result.index.tolist(), ['A'])
+        self.assertEqual(result['A'], 60 * 60)
+        pass
+
+    def test_inverted_and_missing_intervals(self):
+        df = pd.DataFrame({
+            'machine': ['A', 'A', 'B', 'B'],
+            'start': [datetime(2017, 1, 1, 10), datetime(2017, 1, 1, 12), None, datetime(2017, 1, 1, 1)],
+            'end': [datetime(2017, 1, 1, 11), datetime(2017, 1, 1, 11, 30), datetime(2017, 1, 1, 3),
+                    datetime(2017, 1, 1, 2)],
+        })
+        result = sum_intervals_by(df, 'machine', 'start', 'end')
+        self.assertEqual(result['A'], 60 * 60)
+        self.assertEqual(result['B'], 60 * 60)
+        self.assertEqual(result['A'], sum_intervals(start_dates=df['start'][:2], end_dates=df['end'][:2]))
+        pass
+
+    def test_empty_frame(self):
+        df = pd.DataFrame({'machine': [], 'start': np.array([], dtype='datetime64[ns]'),
+                           'end': np.array([], dtype='datetime64[ns]')})
+        result = sum_intervals_by(df, 'machine', 'start', 'end')
+        self.assertEqual(len(result), 0)
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from giammis.utils.gdatetime import time_units_touched, time_units_touched_array
+
+
+class TimeUnitsTouchedArrayTest(unittest.TestCase):
+    def assert_same_as_scalar(self, dates, durations, delta_seconds):
+        event_index, time_units = time_units_touched_array(np.array(dates, dtype='datetime64[ns]'),
+                                                           np.array(durations), delta_seconds)
+        expected_index, expected_units = [], []
+        for i, (date, duration) in enumerate(zip(dates, durations)):
+            units = time_units_touched(date, duration, delta_seconds)
+            expected_index.extend([i] * len(units))
+            expected_units.extend(units)
+        self.assertEqual(event_index.tolist(), expected_index)
+        np.testing.assert_array_equal(time_units, np.array(expected_units, dtype='datetime64[ns]'))
+
+    def test_same_as_scalar(self):
+        rnd = random.Random(42)
+        base = datetime(2017, 5, 10)
+        dates = [base + timedelta(seconds=rnd.randint(0, 60 * 60 * 24 * 30)) for _ in range(500)]
+        durations = [rnd.choice([0, 1, 20, 60, 60 * 60, rnd.randint(0, 60 * 60 * 30)]) for _ in range(500)]
+        for delta_seconds in [60, 60 * 15, 60 * 60, 60 * 60 * 5, 60 * 60 * 24]:
+            self.assert_same_as_scalar(dates, durations, delta_seconds)
+        pass
+
+    def test_edges(self):
+        dates = [datetime(2017, 4, 1, 0, 0), datetime(2017, 4, 1, 21), datetime(2017, 4, 1, 8, 30)]
+        durations = [60 * 60 * 3, 60 * 60 * 3, 60 * 60 * 24 * 2]
+        self.assert_same_as_scalar(dates, durations, 60 * 60 * 24)
+        self.assert_same_as_scalar(dates, durations, 60 * 60)
+        pass
+
+    def test_single_duration(self):
+        dates = np.array([datetime(2017, 5, 10, 8, 30), datetime(2017, 5, 10, 9)], dtype='datetime64[ns]')
+        event_index, time_units = time_units_touched_array(dates, 60 * 60, 60 * 60)
+        self.assertEqual(event_index.tolist(), [0, 0, 1])
+        expected = np.array([datetime(2017, 5, 10, 8), datetime(2017, 5, 10, 9), datetime(2017, 5, 10, 9)],
+                            dtype='datetime64[ns]')
+        np.testing.assert_array_equal(time_units, expected)
+        pass
+
+    def test_as_frame(self):
+        dates = pd.Series([datetime(2017, 5, 10, 8, 30), None])
+        result = time_units_touched_array(dates, 60 * 90, 60 * 60, as_frame=True)
+        self.assertEqual(result.columns.tolist(), ['event_index', 'time_unit'])
+        self.assertEqual(result['event_index'].tolist(), [0, 0])
+        self.assertEqual(result['time_unit'].tolist(), [datetime(2017, 5, 10, 8), datetime(2017, 5, 10, 9)])
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+import numpy as np
+
+from giammis.utils.gmath import SpatialIndex, approximate_neighbour_counts
+from test.utils.random_data import random_lon_lat
+
+MILAN_AREA = {'lon_range': (9, 9.5), 'lat_range': (45, 45.5)}
+
+
+class ApproximateNeighbourCountsTest(unittest.TestCase):
+    def test_refined_counts_are_exact(self):
+        lon, lat = random_lon_lat(3000, **MILAN_AREA)
+        expected = SpatialIndex(np.column_stack([lon, lat]), metric='haversine').count_neighbours(1.5)
+        for resolution in [1, 2, 4]:
+            counts = approximate_neighbour_counts(lon, lat, 1.5, resolution=resolution, refine=True)
+            np.testing.assert_array_equal(counts, expected)
+        pass
+
+    def test_error_bound(self):
+        lon, lat = random_lon_lat(3000, **MILAN_AREA)
+        index = SpatialIndex(np.column_stack([lon, lat]), metric='haversine')
+        for resolution in [2, 4, 8]:
+            counts = approximate_neighbour_counts(lon, lat, 1.5, resolution=resolution)
+            margin = 1.5 * np.sqrt(3) / resolution
+            self.assertTrue((counts >= index.count_neighbours(max(1.5 - margin, 0))).all())
+            self.assertTrue((counts <= index.count_neighbours(1.5 + margin)).all())
+        pass
+
+    def test_small_chunks(self):
+        lon, lat = random_lon_lat(500, **MILAN_AREA)
+        expected = approximate_neighbour_counts(lon, lat, 3, refine=True)
+        counts = approximate_neighbour_counts(lon, lat, 3, refine=True, max_pairs=7)
+        np.testing.assert_array_equal(counts, expected)
+        pass
+
+    def test_duplicates_and_antimeridian(self):
+        lon, lat = [179.999, -179.999, -179.999, 0], [0, 0, 0, 0]
+        counts = approximate_neighbour_counts(lon, lat, 1, refine=True)
+        self.assertEqual(counts.tolist(), [3, 3, 3, 1])
+        self.assertEqual(approximate_neighbour_counts([], [], 1).tolist(), [])
+        pass
+
+    def test_radius_too_small(self):
+        with self.assertRaises(ValueError):
+            approximate_neighbour_counts([0], [0], 1e-6)
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+import numpy as np
+
+from giammis.utils.gmath import cluster_most_representative, cluster_representatives
+
+
+class ClusterRepresentativesTest(unittest.TestCase):
+    def setUp(self):
+        rnd = np.random.RandomState(42)
+        self.centroids = rnd.uniform(0, 100, size=(20, 3))
+        self.labels = rnd.randint(0, 20, size=1000)
+        self.features = self.centroids[self.labels] + rnd.normal(0, 5, size=(1000, 3))
+
+    def test_same_as_cluster_most_representative(self):
+        for n in [1, 3, 10]:
+            result = cluster_representatives(self.features, self.labels, self.centroids, n=n)
+            self.assertEqual(len(result), len(self.centroids))
+            for label, representatives in enumerate(result):
+                cluster = [{'index': i, 'values': self.features[i]} for i in np.flatnonzero(self.labels == label)]
+                expected = cluster_most_representative(cluster, self.centroids[label], 'values', n=n)
+                self.assertEqual(representatives.tolist(), [elem['index'] for elem in expected])
+        pass
+
+    def test_small_and_empty_clusters(self):
+        features = np.array([[0.0, 0.0], [1.0, 1.0], [10.0, 10.0]])
+        labels = np.array([0, 0, 2])
+        centroids = np.array([[0.9, 0.9], [5.0, 5.0], [10.0, 10.0]])
+        result = cluster_representatives(features, labels, centroids, n=5)
+        self.assertEqual([r.tolist() for r in result], [[1, 0], [], [2]])
+        pass
+
+    def test_many_clusters(self):
+        # More than 2 ** 16 clusters, grouped with two passes of the radix sort
+        labels = np.array([70000, 3, 70000, 65536, 3])
+        features = np.array([[5.0], [1.0], [2.0], [0.0], [0.5]])
+        centroids = np.zeros((70001, 1))
+        result = cluster_representatives(features, labels, centroids, n=2)
+        self.assertEqual(result[3].tolist(), [4, 1])
+        self.assertEqual(result[65536].tolist(), [3])
+        self.assertEqual(result[70000].tolist(), [2, 0])
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
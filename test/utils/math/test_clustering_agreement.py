@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+from sklearn import metrics
+
+from giammis.utils.gmath import clustering_agreement, compare_labellings
+from test.utils.random_data import random_labellings
+
+
+class ClusteringAgreementTest(unittest.TestCase):
+    def test_same_as_sklearn(self):
+        for k1, k2 in [(2, 2), (5, 5), (4, 7), (8, 3)]:
+            labels_true, labels_pred = random_labellings(2000, k1, k2, seed=k1 * k2)
+            result = clustering_agreement(labels_true, labels_pred)
+            self.assertAlmostEqual(result['adjusted_rand_index'],
+                                   metrics.adjusted_rand_score(labels_true, labels_pred))
+            self.assertAlmostEqual(result['normalized_mutual_info'],
+                                   metrics.normalized_mutual_info_score(labels_true, labels_pred))
+            homogeneity, completeness, v_measure = metrics.homogeneity_completeness_v_measure(labels_true,
+                                                                                               labels_pred)
+            self.assertAlmostEqual(result['homogeneity'], homogeneity)
+            self.assertAlmostEqual(result['completeness'], completeness)
+            self.assertAlmostEqual(result['v_measure'], v_measure)
+        pass
+
+    def test_accuracy_same_as_compare_labellings(self):
+        labels_true, labels_pred = random_labellings(2000, 6, 6)
+        names = np.arange(len(labels_true))
+        result = clustering_agreement(labels_true, labels_pred)
+        self.assertAlmostEqual(result['accuracy'], compare_labellings(names, labels_true, names, labels_pred)[3])
+        pass
+
+    def test_confusion_matrix(self):
+        labels_true = ['a', 'a', 'b', 'b', 'b', 'c']
+        labels_pred = [2, 2, 0, 0, 1, 1]
+        result = clustering_agreement(labels_true, labels_pred)
+        self.assertEqual(result['labels_true'], ['a', 'b', 'c'])
+        self.assertEqual(result['labels_pred'], [2, 0, 1])
+        np.testing.assert_array_equal(result['confusion_matrix'], [[2, 0, 0], [0, 2, 1], [0, 0, 1]])
+        cm = result['confusion_matrix']
+        self.assertAlmostEqual(result['accuracy'], cm.diagonal().sum() / float(cm.sum()))
+        self.assertAlmostEqual(result['purity'], 5 / 6.0)
+        pass
+
+    def test_perfect_and_trivial_labellings(self):
+        labels = np.array([0, 0, 1, 1, 2])
+        result = clustering_agreement(labels, (labels + 1) % 3)
+        for key in ['accuracy', 'adjusted_rand_index', 'normalized_mutual_info', 'homogeneity', 'completeness',
+                    'v_measure', 'purity']:
+            self.assertAlmostEqual(result[key], 1.0, msg=key)
+        result = clustering_agreement(np.zeros(5), np.zeros(5))
+        self.assertAlmostEqual(result['adjusted_rand_index'], 1.0)
+        self.assertAlmostEqual(result['normalized_mutual_info'], 1.0)
+        pass
+
+    def test_sparse_same_as_dense(self):
+        for k1, k2 in [(5, 5), (4, 7), (8, 3), (60, 40)]:
+            labels_true, labels_pred = random_labellings(2000, k1, k2, seed=k1 * k2)
+            dense = clustering_agreement(labels_true, labels_pred)
+            result = clustering_agreement(labels_true, labels_pred, max_dense_cells=0)
+            for key in ['accuracy', 'adjusted_rand_index', 'normalized_mutual_info', 'purity']:
+                self.assertAlmostEqual(result[key], dense[key], msg=key)
+            self.assertEqual(result['confusion_matrix'].sum(), 2000)
+            self.assertEqual(sorted(result['labels_pred']), sorted(dense['labels_pred']))
+        pass
+
+    def test_sparse_matching_without_full_matching(self):
+        # The two reference labels only share the same predicted label
+        labels_true = [0, 0, 0, 1, 2, 2]
+        labels_pred = [0, 0, 0, 0, 1, 2]
+        result = clustering_agreement(labels_true, labels_pred, max_dense_cells=0)
+        self.assertAlmostEqual(result['accuracy'], 4 / 6.0)
+        self.assertAlmostEqual(result['purity'], 5 / 6.0)
+        pass
+
+    def test_empty_labellings(self):
+        with self.assertRaises(ValueError):
+            clustering_agreement([], [])
+        pass
+
+    def test_different_lengths(self):
+        with self.assertRaises(ValueError):
+            clustering_agreement([0, 1], [0])
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
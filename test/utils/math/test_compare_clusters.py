@@ -0,0 +1,119 @@
+import itertools
+import random
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from giammis.utils.gmath import compare_clusters, compare_labellings
+
+
+def labelling(names, labels):
+    return [{'name': name, 'label': label} for name, label in zip(names, labels)]
+
+
+def brute_force_matchings(c1, c2):
+    labels = sorted(set(elem['label'] for elem in c2))
+    label_c1 = {elem['name']: elem['label'] for elem in c1}
+    best = 0
+    for permutation in itertools.permutations(labels):
+        re_label = dict(zip(labels, permutation))
+        best = max(best, sum(1 for elem in c2 if label_c1.get(elem['name']) == re_label[elem['label']]))
+    return best
+
+
+class CompareClustersTest(unittest.TestCase):
+    def setUp(self):
+        self.names = list('ABCDEFGHI')
+        self.c1 = labelling(self.names, [0, 0, 1, 1, 2, 2, 3, 3, 3])
+
+    def test_perfect_relabelling(self):
+        c2 = labelling(self.names, [1, 1, 2, 2, 3, 3, 0, 0, 0])
+        c1, new_c2, matchings, accuracy, re_label = compare_clusters(self.c1, c2)
+        self.assertEqual(len(matchings), len(c1))
+        self.assertEqual(accuracy, 1)
+        self.assertEqual(re_label, {1: 0, 2: 1, 3: 2, 0: 3})
+        self.assertEqual([elem['label'] for elem in new_c2], [elem['label'] for elem in self.c1])
+        pass
+
+    def test_one_mismatch(self):
+        c2 = labelling(self.names, [2, 2, 0, 0, 1, 1, 1, 3, 3])
+        result = compare_clusters(self.c1, c2)
+        self.assertEqual(len(result[2]), len(self.c1) - 1)
+        self.assertEqual(result[3], (len(c2) - 1) / len(self.c1))
+        pass
+
+    def test_only_co_occurring_names(self):
+        c2 = labelling(self.names[:4] + ['Z'], [1, 1, 0, 0, 0])
+        c1, new_c2, matchings, accuracy, re_label = compare_clusters(self.c1, c2)
+        self.assertEqual([elem['name'] for elem in c1], list('ABCD'))
+        self.assertEqual([elem['name'] for elem in new_c2], list('ABCD'))
+        self.assertEqual(accuracy, 1)
+        pass
+
+    def test_same_as_brute_force(self):
+        rnd = random.Random(42)
+        for _ in range(20):
+            names = list(range(60))
+            c1 = labelling(names, [rnd.randint(0, 4) for _ in names])
+            c2 = labelling(names, [rnd.randint(0, 5) for _ in names])
+            _, new_c2, matchings, accuracy, re_label = compare_clusters(c1, c2)
+            expected = brute_force_matchings(c1, c2)
+            self.assertEqual(accuracy, expected / len(c1))
+            self.assertEqual(len(matchings), expected)
+            self.assertEqual(sorted(re_label.keys()), sorted(re_label.values()))
+        pass
+
+    def test_many_labels(self):
+        names = list(range(1000))
+        c1 = labelling(names, [name % 100 for name in names])
+        c2 = labelling(names, [(name * 7 + 3) % 100 for name in names])
+        accuracy = compare_clusters(c1, c2)[3]
+        self.assertEqual(accuracy, 1)
+        pass
+
+
+    def test_data_frames_same_as_lists(self):
+        rnd = random.Random(7)
+        names = list(range(300))
+        c1 = labelling(names, [rnd.randint(0, 6) for _ in names])
+        c2 = labelling(names[50:] + [1000, 1001], [rnd.randint(0, 6) for _ in range(252)])
+        expected = compare_clusters(c1, c2)
+        result = compare_clusters(pd.DataFrame(c1), pd.DataFrame(c2))
+        self.assertEqual(result[0].to_dict('records'), expected[0])
+        self.assertEqual(result[1].to_dict('records'), expected[1])
+        self.assertEqual(list(result[2]), expected[2])
+        self.assertEqual(result[3], expected[3])
+        self.assertEqual(result[4], expected[4])
+        pass
+
+    def test_columnar_same_as_lists(self):
+        rnd = random.Random(9)
+        names = ['N{}'.format(i) for i in range(300)]
+        labels1 = [rnd.randint(0, 6) for _ in names]
+        labels2 = [rnd.randint(0, 6) for _ in names]
+        expected = compare_clusters(labelling(names, labels1), labelling(names[::-1], labels2[::-1]))
+        result = compare_labellings(np.array(names), np.array(labels1), np.array(names[::-1]), np.array(labels2[::-1]))
+        self.assertEqual(list(result[2]), expected[2])
+        self.assertEqual(result[3], expected[3])
+        self.assertEqual(result[4], expected[4])
+        pass
+
+    def test_large_columnar(self):
+        n = 10 ** 6
+        names = np.arange(n)
+        labels1 = names % 500
+        labels2 = (labels1 * 7 + 3) % 500
+        labels2[:1000] = 0
+        start = time.time()
+        _, _, matchings, accuracy, re_label = compare_labellings(names, labels1, names[::-1], labels2[::-1])
+        self.assertLess(time.time() - start, 30)
+        self.assertEqual(len(re_label), 500)
+        self.assertAlmostEqual(accuracy, len(matchings) / float(n))
+        self.assertGreater(accuracy, 0.99)
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+
+from giammis.utils.gmath import grid_distance, manhattan_distance
+
+
+class GridDistanceTest(unittest.TestCase):
+    def setUp(self):
+        rnd = np.random.RandomState(42)
+        self.cells1 = rnd.randint(0, 1000, size=(60, 2))
+        self.cells2 = rnd.randint(0, 1000, size=(80, 2))
+
+    def test_element_wise_same_as_scalar(self):
+        cells2 = self.cells2[:60]
+        result = grid_distance(self.cells1, cells2)
+        expected = [manhattan_distance(c1, c2) for c1, c2 in zip(self.cells1, cells2)]
+        np.testing.assert_array_equal(result, expected)
+        pass
+
+    def test_one_to_many(self):
+        result = grid_distance((10, 20), self.cells2)
+        expected = [manhattan_distance(np.array([10, 20]), c2) for c2 in self.cells2]
+        np.testing.assert_array_equal(result, expected)
+        pass
+
+    def test_pairwise_same_as_scalar(self):
+        result = grid_distance(self.cells1, self.cells2, pairwise=True, max_memory_mb=0.001)
+        self.assertEqual(result.shape, (60, 80))
+        for i, c1 in enumerate(self.cells1):
+            np.testing.assert_array_equal(result[i], [manhattan_distance(c1, c2) for c2 in self.cells2])
+        pass
+
+    def test_dtypes(self):
+        for dtype in [np.int16, np.int32]:
+            result = grid_distance(self.cells1, self.cells2, pairwise=True, dtype=dtype)
+            self.assertEqual(result.dtype, dtype)
+            np.testing.assert_array_equal(result, grid_distance(self.cells1, self.cells2, pairwise=True))
+        pass
+
+    def test_unsigned_and_narrow_dtypes(self):
+        cells1, cells2 = np.array([[3, 3]], dtype=np.uint8), np.array([[5, 5]], dtype=np.uint8)
+        self.assertEqual(grid_distance(cells1, cells2).tolist(), [4])
+        self.assertEqual(grid_distance(cells1, cells2, pairwise=True).tolist(), [[4]])
+        self.assertEqual(grid_distance(cells1, cells2, metric='chebyshev').tolist(), [2])
+        # The coordinates do not fit in int16, their distance does
+        cells1, cells2 = np.array([[40000, 0]]), np.array([[40010, 5]])
+        self.assertEqual(grid_distance(cells1, cells2, dtype=np.int16).tolist(), [15])
+        self.assertEqual(grid_distance(cells1, cells2, pairwise=True, dtype=np.int16).tolist(), [[15]])
+        pass
+
+    def test_other_metrics(self):
+        diff = np.abs(self.cells1[:, None, :] - self.cells2[None, :, :])
+        result = grid_distance(self.cells1, self.cells2, pairwise=True, metric='chebyshev')
+        np.testing.assert_array_equal(result, diff.max(axis=2))
+        result = grid_distance(self.cells1, self.cells2, pairwise=True, metric='euclidean', dtype=np.float32)
+        self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_allclose(result, np.sqrt((diff ** 2).sum(axis=2)), rtol=1e-6)
+        with self.assertRaises(ValueError):
+            grid_distance(self.cells1, self.cells2, metric='hamming')
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+
+from giammis.utils.gmath import haversine, haversine_array, nearest_haversine
+from test.utils.random_data import random_lon_lat
+
+
+class HaversineArrayTest(unittest.TestCase):
+    def test_element_wise_same_as_scalar(self):
+        lon1, lat1 = random_lon_lat(500, seed=1)
+        lon2, lat2 = random_lon_lat(500, seed=2)
+        result = haversine_array(lon1, lat1, lon2, lat2)
+        expected = [haversine(*args) for args in zip(lon1, lat1, lon2, lat2)]
+        np.testing.assert_allclose(result, expected, rtol=1e-10)
+        pass
+
+    def test_one_to_many(self):
+        lon2, lat2 = random_lon_lat(100)
+        result = haversine_array(9.19, 45.46, lon2, lat2)
+        expected = [haversine(9.19, 45.46, lon, lat) for lon, lat in zip(lon2, lat2)]
+        np.testing.assert_allclose(result, expected, rtol=1e-10)
+        pass
+
+    def test_pairwise_same_as_scalar(self):
+        lon1, lat1 = random_lon_lat(50, seed=1)
+        lon2, lat2 = random_lon_lat(70, seed=2)
+        # Tiny memory budget, so that the matrix is computed one row at a time
+        result = haversine_array(lon1, lat1, lon2, lat2, pairwise=True, max_memory_mb=0.001)
+        self.assertEqual(result.shape, (50, 70))
+        for i in range(50):
+            expected = [haversine(lon1[i], lat1[i], lon2[j], lat2[j]) for j in range(70)]
+            np.testing.assert_allclose(result[i], expected, rtol=1e-10)
+        pass
+
+    def test_float32(self):
+        lon1, lat1 = random_lon_lat(50, seed=1)
+        lon2, lat2 = random_lon_lat(70, seed=2)
+        result = haversine_array(lon1, lat1, lon2, lat2, pairwise=True, dtype=np.float32)
+        self.assertEqual(result.dtype, np.float32)
+        expected = haversine_array(lon1, lat1, lon2, lat2, pairwise=True)
+        np.testing.assert_allclose(result, expected, rtol=1e-3, atol=1)
+        pass
+
+    def test_nearest(self):
+        lon, lat = random_lon_lat(300, seed=1)
+        ref_lon, ref_lat = random_lon_lat(40, seed=2)
+        indices, km = nearest_haversine(lon, lat, ref_lon, ref_lat, max_memory_mb=0.01)
+        distances = haversine_array(lon, lat, ref_lon, ref_lat, pairwise=True)
+        np.testing.assert_array_equal(indices, distances.argmin(axis=1))
+        np.testing.assert_allclose(km, distances.min(axis=1))
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+
+from giammis.utils.gmath import isolated_points, no_points_close_to_me
+from test.utils.random_data import random_points
+
+
+class IsolatedPointsTest(unittest.TestCase):
+    def test_same_as_no_points_close_to_me(self):
+        points = random_points(200)
+        isolated, counts = isolated_points(points, radius=60)
+        expected = [no_points_close_to_me(me, points, radius=60) for me in points]
+        self.assertEqual(isolated.tolist(), expected)
+        self.assertTrue(isolated.any() and not isolated.all())
+        pass
+
+    def test_counts(self):
+        points = random_points(300)
+        _, counts = isolated_points(points, radius=100)
+        distances = np.linalg.norm(points[:, None, :] - points[None, :, :], axis=2)
+        np.testing.assert_array_equal(counts, (distances <= 100).sum(axis=1) - 1)
+        pass
+
+    def test_duplicates_are_not_isolated(self):
+        points = [(0, 0), (0, 0), (500, 500)]
+        isolated, counts = isolated_points(points, radius=1)
+        self.assertEqual(isolated.tolist(), [False, False, True])
+        self.assertEqual(counts.tolist(), [1, 1, 0])
+        pass
+
+    def test_memory_budget_and_threads(self):
+        points = random_points(500)
+        expected_isolated, expected_counts = isolated_points(points, radius=40)
+        for max_memory_mb, n_jobs in [(0.01, 1), (0.01, 4), (1, -1)]:
+            isolated, counts = isolated_points(points, radius=40, max_memory_mb=max_memory_mb, n_jobs=n_jobs)
+            np.testing.assert_array_equal(isolated, expected_isolated)
+            np.testing.assert_array_equal(counts, expected_counts)
+        pass
+
+    def test_empty(self):
+        isolated, counts = isolated_points(np.empty((0, 2)))
+        self.assertEqual(len(isolated), 0)
+        self.assertEqual(len(counts), 0)
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
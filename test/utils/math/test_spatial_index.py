@@ -0,0 +1,51 @@
+import random
+import unittest
+
+import numpy as np
+
+from giammis.utils.gmath import SpatialIndex, haversine_array, no_points_close_to_me
+from test.utils.random_data import random_points
+
+
+class SpatialIndexTest(unittest.TestCase):
+    def test_euclidean_counts(self):
+        points = random_points(500)
+        index = SpatialIndex(points)
+        counts = index.count_neighbours(50)
+        distances = np.linalg.norm(points[:, None, :] - points[None, :, :], axis=2)
+        np.testing.assert_array_equal(counts, (distances <= 50).sum(axis=1))
+        pass
+
+    def test_external_query_points(self):
+        points = random_points(500)
+        queries = random_points(20, seed=1)
+        counts = SpatialIndex(points).count_neighbours(80, queries)
+        distances = np.linalg.norm(queries[:, None, :] - points[None, :, :], axis=2)
+        np.testing.assert_array_equal(counts, (distances <= 80).sum(axis=1))
+        pass
+
+    def test_haversine_counts(self):
+        rnd = random.Random(42)
+        points = np.array([(rnd.uniform(6, 18), rnd.uniform(36, 47)) for _ in range(400)])
+        index = SpatialIndex(points, metric='haversine')
+        distances = haversine_array(points[:, 0], points[:, 1], points[:, 0], points[:, 1], pairwise=True)
+        for radius in [10, 50, 200]:
+            np.testing.assert_array_equal(index.count_neighbours(radius), (distances <= radius).sum(axis=1))
+        pass
+
+    def test_no_points_close_to_me_with_index(self):
+        points = random_points(300, seed=3)
+        index = SpatialIndex(points)
+        for me in points[:50]:
+            self.assertEqual(no_points_close_to_me(me, points, radius=30, index=index),
+                             no_points_close_to_me(me, points, radius=30))
+        pass
+
+    def test_wrong_metric(self):
+        with self.assertRaises(ValueError):
+            SpatialIndex(random_points(10), metric='manhattan')
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
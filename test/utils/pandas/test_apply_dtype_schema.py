@@ -0,0 +1,61 @@
+import json
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from giammis.utils.gpandas import apply_dtype_schema, dtype_schema, optimize_memory_usage
+from test.utils.random_data import random_mixed_frame
+
+
+class ApplyDtypeSchemaTest(unittest.TestCase):
+    def test_optimize_memory_usage_schema(self):
+        df = random_mixed_frame(1000)
+        optimized, schema = optimize_memory_usage(df, return_schema=True)
+        self.assertEqual(schema['small_int'], {'dtype': 'int8'})
+        self.assertEqual(schema['quarters'], {'dtype': 'float32'})
+        self.assertEqual(schema['label'], {'dtype': 'category', 'categories': ['blue', 'green', 'red']})
+        self.assertEqual(schema, dtype_schema(optimized))
+        self.assertEqual(json.loads(json.dumps(schema)), schema)
+        self.assertEqual(df['small_int'].dtype, np.int64)
+        pass
+
+    def test_same_as_optimize_memory_usage(self):
+        _, schema = optimize_memory_usage(random_mixed_frame(1000), return_schema=True)
+        other = random_mixed_frame(1000, seed=7)
+        pd.testing.assert_frame_equal(apply_dtype_schema(other, schema), optimize_memory_usage(other))
+        pass
+
+    def test_stable_categories(self):
+        _, schema = optimize_memory_usage(random_mixed_frame(1000), return_schema=True)
+        other = pd.DataFrame({'label': ['red', 'pink', 'blue'], 'extra': [1, 2, 3]})
+        result = apply_dtype_schema(other, schema)
+        self.assertEqual(result['label'].cat.categories.tolist(), ['blue', 'green', 'red'])
+        self.assertEqual(result['label'].cat.codes.tolist(), [2, -1, 0])
+        self.assertEqual(result['extra'].dtype, np.int64)
+        pass
+
+    def test_integers_out_of_range(self):
+        result = apply_dtype_schema(pd.DataFrame({'a': [200, 1], 'b': [-3, 1]}),
+                                    {'a': {'dtype': 'int8'}, 'b': {'dtype': 'int8'}})
+        self.assertEqual(result['a'].tolist(), [200, 1])
+        self.assertEqual(result['a'].dtype, np.int16)
+        self.assertEqual(result['b'].dtype, np.int8)
+        with self.assertRaises(ValueError):
+            apply_dtype_schema(pd.DataFrame({'a': [0.5]}), {'a': {'dtype': 'int8'}})
+        with self.assertRaises(ValueError):
+            apply_dtype_schema(pd.DataFrame({'a': [2 ** 63]}, dtype='uint64'), {'a': {'dtype': 'int8'}})
+        pass
+
+    def test_missing_integers(self):
+        result = apply_dtype_schema(pd.DataFrame({'a': [np.nan, 1.0], 'b': [np.nan, 1000.0]}),
+                                    {'a': {'dtype': 'int8'}, 'b': {'dtype': 'Int8'}})
+        self.assertEqual(str(result['a'].dtype), 'Int8')
+        self.assertEqual(result['a'].tolist(), [pd.NA, 1])
+        self.assertEqual(str(result['b'].dtype), 'Int16')
+        self.assertEqual(result['b'].tolist(), [pd.NA, 1000])
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
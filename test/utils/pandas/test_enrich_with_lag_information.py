@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from giammis.utils.gpandas import enrich_with_lag_information
+
+
+def sample_frame():
+    return pd.DataFrame({
+        'subject': ['b', 'a', 'a', 'b', 'a', 'b', 'a'],
+        'time': pd.to_datetime(['2018-01-01 10:00', '2018-01-01 12:00', '2018-01-01 10:00', '2018-01-01 11:00',
+                                '2018-01-01 11:00', '2018-01-01 12:00', '2018-01-01 13:00']),
+        'value': [10, 3, 1, 20, 2, 30, 4],
+        'other': [0.5, 0.3, 0.1, 0.6, 0.2, 0.7, 0.4],
+    })
+
+
+class EnrichWithLagInformationTest(unittest.TestCase):
+    def test_drop_incomplete(self):
+        result = enrich_with_lag_information(sample_frame(), 'time', 'subject', lags=[1])
+        self.assertEqual(result.columns.tolist(), ['subject', 'time', 'value', 'other', 'value_LAG_1', 'other_LAG_1'])
+        self.assertEqual(result.index.tolist(), list(range(5)))
+        self.assertEqual(result['value'].tolist(), [3, 20, 2, 30, 4])
+        self.assertEqual(result['value_LAG_1'].tolist(), [2, 10, 1, 20, 3])
+        pass
+
+    def test_multiple_lags_keep_all_rows(self):
+        df = sample_frame()
+        result = enrich_with_lag_information(df, 'time', 'subject', lags=[1, 2, -1], drop_incomplete=False)
+        self.assertEqual(len(result), len(df))
+        self.assertEqual(result['value'].tolist(), df['value'].tolist())
+        np.testing.assert_array_equal(result['value_LAG_1'], [np.nan, 2, np.nan, 10, 1, 20, 3])
+        np.testing.assert_array_equal(result['value_LAG_2'], [np.nan, 1, np.nan, np.nan, np.nan, 10, 2])
+        np.testing.assert_array_equal(result['value_LAG_-1'], [20, 4, 2, 30, 3, np.nan, np.nan])
+        pass
+
+    def test_exclude_cols(self):
+        result = enrich_with_lag_information(sample_frame(), 'time', 'subject', lags=[1, 2], exclude_cols=['other'])
+        self.assertEqual(result.columns.tolist(), ['subject', 'time', 'value', 'other', 'value_LAG_1', 'value_LAG_2'])
+        self.assertEqual(sorted(result['value'].tolist()), [3, 4, 30])
+        pass
+
+    def test_original_is_not_modified(self):
+        df = sample_frame()
+        enrich_with_lag_information(df, 'time', 'subject', lags=[1])
+        pd.testing.assert_frame_equal(df, sample_frame())
+        pass
+
+    def test_missing_subject(self):
+        df = sample_frame()
+        df.loc[0, 'subject'] = None
+        result = enrich_with_lag_information(df, 'time', 'subject', lags=[1], drop_incomplete=False)
+        self.assertTrue(np.isnan(result.loc[0, 'value_LAG_1']))
+        self.assertTrue(np.isnan(result.loc[3, 'value_LAG_1']))
+        self.assertEqual(len(enrich_with_lag_information(df, 'time', 'subject', lags=[1])), 4)
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from giammis.utils.gpandas import enrich_with_simple_time_features
+from test.utils.random_data import random_dates
+
+
+def time_frame(n=2000, tz=None):
+    times = pd.Series(random_dates(n, start=datetime(1965, 1, 1), span_seconds=2 * 10 ** 9))
+    return pd.DataFrame({'time': times.dt.tz_localize(tz) if tz else times, 'value': np.arange(n)})
+
+
+class EnrichWithSimpleTimeFeaturesTest(unittest.TestCase):
+    def test_same_as_scalar_features(self):
+        for tz in [None, 'Europe/Rome']:
+            df = time_frame(tz=tz)
+            result = enrich_with_simple_time_features(df, 'time')
+            self.assertEqual(result.columns.tolist(), ['time', 'value', 'MONTH', 'WEEK', 'WEEKEND', 'WEEKDAY', 'HOUR'])
+            self.assertEqual(result['MONTH'].tolist(), [x.month for x in df['time']])
+            self.assertEqual(result['WEEK'].tolist(), [x.isocalendar()[1] for x in df['time']])
+            self.assertEqual(result['WEEKEND'].tolist(), [x.weekday() >= 5 for x in df['time']])
+            self.assertEqual(result['WEEKDAY'].tolist(), [x.weekday() for x in df['time']])
+            self.assertEqual(result['HOUR'].tolist(), [x.hour for x in df['time']])
+            self.assertEqual([str(result[col].dtype) for col in ['MONTH', 'WEEK', 'WEEKEND', 'WEEKDAY', 'HOUR']],
+                             ['int8', 'int8', 'bool', 'int8', 'int8'])
+            self.assertNotIn('MONTH', df.columns)
+        pass
+
+    def test_other_features(self):
+        df = time_frame()
+        result = enrich_with_simple_time_features(df, 'time', features=['MINUTE', 'QUARTER', 'DAYOFYEAR'])
+        self.assertEqual(result['MINUTE'].tolist(), [x.minute for x in df['time']])
+        self.assertEqual(result['QUARTER'].tolist(), [x.quarter for x in df['time']])
+        self.assertEqual(result['DAYOFYEAR'].tolist(), [x.dayofyear for x in df['time']])
+        self.assertEqual(result['DAYOFYEAR'].dtype, np.int16)
+        pass
+
+    def test_cyclic_features(self):
+        df = pd.DataFrame({'time': pd.to_datetime(['2018-01-01 00:00', '2018-04-01 06:00', '2020-12-31 18:00'])})
+        result = enrich_with_simple_time_features(df, 'time', features=['HOUR_SIN', 'HOUR_COS', 'MONTH_COS',
+                                                                          'DAYOFYEAR_SIN'])
+        np.testing.assert_allclose(result['HOUR_SIN'], [0, 1, -1], atol=1e-6)
+        np.testing.assert_allclose(result['HOUR_COS'], [1, 0, 0], atol=1e-6)
+        np.testing.assert_allclose(result['MONTH_COS'], [1, 0, np.cos(2 * np.pi * 11 / 12)], atol=1e-6)
+        np.testing.assert_allclose(result['DAYOFYEAR_SIN'], [0, np.sin(2 * np.pi * 90 / 365),
+                                                             np.sin(2 * np.pi * 365 / 366)], atol=1e-6)
+        self.assertEqual(result['HOUR_SIN'].dtype, np.float32)
+        pass
+
+    def test_inplace_and_missing(self):
+        df = pd.DataFrame({'time': pd.to_datetime(['2018-01-06 10:00', None])}, index=[5, 7])
+        result = enrich_with_simple_time_features(df, 'time', features=['WEEKEND', 'HOUR', 'HOUR_SIN'], inplace=True)
+        self.assertIs(result, df)
+        self.assertEqual(df['WEEKEND'].tolist(), [True, pd.NA])
+        self.assertEqual(df['HOUR'].tolist(), [10, pd.NA])
+        self.assertEqual(str(df['HOUR'].dtype), 'Int8')
+        self.assertTrue(np.isnan(df.loc[7, 'HOUR_SIN']))
+        pass
+
+    def test_empty_frame(self):
+        features = ['MONTH', 'WEEK', 'WEEKEND', 'DAYOFYEAR', 'DAYOFYEAR_SIN']
+        result = enrich_with_simple_time_features(time_frame(0), 'time', features=features)
+        self.assertEqual(len(result), 0)
+        self.assertEqual([str(result[col].dtype) for col in features], ['int8', 'int8', 'bool', 'int16', 'float32'])
+        pass
+
+    def test_unknown_feature(self):
+        with self.assertRaises(ValueError):
+            enrich_with_simple_time_features(time_frame(10), 'time', features=['WEEKEND_SIN'])
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
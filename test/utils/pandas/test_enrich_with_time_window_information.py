@@ -0,0 +1,76 @@
+import unittest
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from giammis.utils.gpandas import enrich_with_time_window_information
+
+
+def sample_frame():
+    return pd.DataFrame({
+        'subject': ['a', 'b', 'a', 'a', 'b', None],
+        'time': pd.to_datetime(['2018-01-01 10:10', '2018-01-01 10:05', '2018-01-01 10:00', '2018-01-01 10:31',
+                                '2018-01-01 10:20', '2018-01-01 10:00']),
+        'value': [2, 3, 1, 4, 5, 6],
+    })
+
+
+class EnrichWithTimeWindowInformationTest(unittest.TestCase):
+    def test_time_lags(self):
+        result = enrich_with_time_window_information(sample_frame(), 'time', 'subject',
+                                                     lags=['10min', timedelta(minutes=15)])
+        self.assertEqual(result.columns.tolist(), ['subject', 'time', 'value', 'value_LAG_10min', 'value_LAG_15min'])
+        np.testing.assert_array_equal(result['value_LAG_10min'], [1, np.nan, np.nan, 2, 3, np.nan])
+        np.testing.assert_array_equal(result['value_LAG_15min'], [np.nan, np.nan, np.nan, 2, 3, np.nan])
+        self.assertEqual(result['value_LAG_10min'].dtype, np.float32)
+        pass
+
+    def test_tolerance(self):
+        result = enrich_with_time_window_information(sample_frame(), 'time', 'subject', lags=['15min'],
+                                                     tolerance='5min')
+        np.testing.assert_array_equal(result['value_LAG_15min'], [np.nan, np.nan, np.nan, np.nan, 3, np.nan])
+        pass
+
+    def test_same_as_merge_asof(self):
+        rnd = np.random.RandomState(0)
+        n = 5000
+        df = pd.DataFrame({'subject': rnd.randint(0, 20, n),
+                           'time': pd.Timestamp('2018-01-01') + pd.to_timedelta(rnd.randint(0, 10 ** 6, n), 's'),
+                           'value': rnd.rand(n)})
+        result = enrich_with_time_window_information(df, 'time', 'subject', lags=['1h'], dtype=None)
+        queries = df.assign(target=df['time'] - pd.Timedelta('1h')).sort_values('target')
+        right = df.rename(columns={'time': 'lag_time', 'value': 'expected'}).sort_values('lag_time')
+        expected = pd.merge_asof(queries, right, left_on='target', right_on='lag_time', by='subject')
+        expected = expected.set_index(['subject', 'time'])['expected']
+        actual = result.set_index(['subject', 'time'])['value_LAG_1h']
+        np.testing.assert_array_equal(expected.reindex(actual.index).values, actual.values)
+        pass
+
+    def test_rolling(self):
+        result = enrich_with_time_window_information(sample_frame(), 'time', 'subject', windows=['15min'],
+                                                     aggs=['mean', 'count', 'max'], dtype=None)
+        np.testing.assert_array_equal(result['value_ROLLING_MEAN_15min'], [1.5, 3, 1, 4, 5, np.nan])
+        np.testing.assert_array_equal(result['value_ROLLING_COUNT_15min'], [2, 1, 1, 1, 1, np.nan])
+        np.testing.assert_array_equal(result['value_ROLLING_MAX_15min'], [2, 3, 1, 4, 5, np.nan])
+        pass
+
+    def test_empty_frame(self):
+        result = enrich_with_time_window_information(sample_frame().iloc[:0], 'time', 'subject', lags=['10min'],
+                                                     windows=['15min'], aggs=['mean', 'count'])
+        self.assertEqual(len(result), 0)
+        self.assertEqual(result.columns.tolist(), ['subject', 'time', 'value', 'value_LAG_10min',
+                                                   'value_ROLLING_MEAN_15min', 'value_ROLLING_COUNT_15min'])
+        self.assertTrue((result.dtypes.iloc[3:] == np.float32).all())
+        pass
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            enrich_with_time_window_information(sample_frame(), 'time', 'subject')
+        with self.assertRaises(ValueError):
+            enrich_with_time_window_information(sample_frame(), 'time', 'subject', windows=['1h'], aggs=['median'])
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
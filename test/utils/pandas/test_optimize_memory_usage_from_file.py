@@ -0,0 +1,95 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from giammis.utils.gpandas import (infer_dtype_schema, optimize_memory_usage, optimize_memory_usage_from_file,
+                                   schema_to_dtypes)
+from test.utils.random_data import random_mixed_frame
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class OptimizeMemoryUsageFromFileTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.folder, 'data.csv')
+        random_mixed_frame(4000).to_csv(self.csv_path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_same_dtypes_as_in_memory(self):
+        df, schema = optimize_memory_usage_from_file(self.csv_path, chunksize=500)
+        expected = optimize_memory_usage(pd.read_csv(self.csv_path))
+        self.assertEqual(df.dtypes.astype(str).to_dict(), expected.dtypes.astype(str).to_dict())
+        self.assertEqual(schema['label'], {'dtype': 'category', 'categories': ['blue', 'green', 'red']})
+        self.assertEqual(schema['small_int'], {'dtype': 'int8'})
+        self.assertEqual(schema['big_int'], {'dtype': 'int32'})
+        self.assertEqual(schema['with_nan'], {'dtype': 'float32'})
+        pd.testing.assert_frame_equal(df, expected, check_categorical=False)
+        pass
+
+    def test_schema_reuse(self):
+        _, schema = optimize_memory_usage_from_file(self.csv_path, chunksize=1000)
+        schema = json.loads(json.dumps(schema))
+        pd.DataFrame({'small_int': [1], 'big_int': [2], 'quarters': [0.5], 'with_nan': [np.nan], 'label': ['pink'],
+                      'name': ['x'], 'flag': [True]}).to_csv(self.csv_path, index=False)
+        df, same_schema = optimize_memory_usage_from_file(self.csv_path, schema=schema)
+        self.assertEqual(same_schema, schema)
+        self.assertEqual(df['label'].cat.categories.tolist(), ['blue', 'green', 'red'])
+        self.assertTrue(df['label'].isnull().all())
+        pass
+
+    def test_schema_reuse_widens_integers(self):
+        pd.DataFrame({'a': [1, 2, 3]}).to_csv(self.csv_path, index=False)
+        _, schema = optimize_memory_usage_from_file(self.csv_path)
+        self.assertEqual(schema, {'a': {'dtype': 'int8'}})
+        pd.DataFrame({'a': [1, 300, 3]}).to_csv(self.csv_path, index=False)
+        df, new_schema = optimize_memory_usage_from_file(self.csv_path, schema=schema, chunksize=1)
+        self.assertEqual(df['a'].tolist(), [1, 300, 3])
+        self.assertEqual(df['a'].dtype, np.int16)
+        self.assertEqual(new_schema, {'a': {'dtype': 'int16'}})
+        self.assertEqual(schema, {'a': {'dtype': 'int8'}})
+        pd.DataFrame({'a': [1.5]}).to_csv(self.csv_path, index=False)
+        with self.assertRaises(ValueError):
+            optimize_memory_usage_from_file(self.csv_path, schema=schema)
+        pass
+
+    def test_parse_dates(self):
+        pd.DataFrame({'ts': ['2018-01-01 10:00', '2018-01-02 11:00'], 'a': [1, 2]}).to_csv(self.csv_path,
+                                                                                           index=False)
+        df, schema = optimize_memory_usage_from_file(self.csv_path, parse_dates=['ts'])
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df['ts']))
+        self.assertEqual(df['ts'].tolist(), [pd.Timestamp('2018-01-01 10:00'), pd.Timestamp('2018-01-02 11:00')])
+        df, _ = optimize_memory_usage_from_file(self.csv_path, schema=schema, parse_dates=['ts'])
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df['ts']))
+        pass
+
+    def test_max_categories(self):
+        schema = infer_dtype_schema(self.csv_path, chunksize=1000, max_categories=2)
+        self.assertNotEqual(schema['label']['dtype'], 'category')
+        self.assertEqual(schema_to_dtypes({'a': {'dtype': 'category', 'categories': ['x']}, 'b': {'dtype': 'int8'}}),
+                         {'a': pd.CategoricalDtype(['x']), 'b': 'int8'})
+        pass
+
+    @unittest.skipIf(pyarrow is None, "pyarrow not installed")
+    def test_parquet(self):
+        parquet_path = os.path.join(self.folder, 'data.parquet')
+        random_mixed_frame(4000).to_parquet(parquet_path)
+        df, schema = optimize_memory_usage_from_file(parquet_path, chunksize=700)
+        expected = optimize_memory_usage(pd.read_parquet(parquet_path))
+        self.assertEqual(df.dtypes.astype(str).to_dict(), expected.dtypes.astype(str).to_dict())
+        pd.testing.assert_frame_equal(df, expected, check_categorical=False)
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""Deterministic random data shared by the tests comparing vectorized functions with their scalar versions."""
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+
+def random_dates(n, start=datetime(2017, 1, 1), span_seconds=60 * 60 * 24 * 365, microseconds=False, seed=42):
+    rnd = random.Random(seed)
+    return [start + timedelta(seconds=rnd.randint(0, span_seconds),
+                              microseconds=rnd.randint(0, 999999) if microseconds else 0)
+            for _ in range(n)]
+
+
+def random_intervals(n, start=datetime(2017, 10, 1), span_seconds=60 * 60 * 24, max_duration_seconds=60 * 30,
+                     seed=42):
+    rnd = random.Random(seed)
+    intervals = []
+    for _ in range(n):
+        start_date = start + timedelta(seconds=rnd.randint(0, span_seconds))
+        end_date = start_date + timedelta(seconds=rnd.randint(0, max_duration_seconds))
+        intervals.append((start_date, end_date))
+    return intervals
+
+
+def random_intervals_frame(n, n_subjects, seed=42):
+    rnd = random.Random(seed)
+    intervals = random_intervals(n, max_duration_seconds=60 * 60, seed=seed)
+    return pd.DataFrame({'machine': ['M{}'.format(rnd.randint(0, n_subjects - 1)) for _ in range(n)],
+                         'start': [interval[0] for interval in intervals],
+                         'end': [interval[1] for interval in intervals]})
+
+
+def random_points(n, scale=1000, seed=42):
+    rnd = random.Random(seed)
+    return np.array([(rnd.uniform(0, scale), rnd.uniform(0, scale)) for _ in range(n)])
+
+
+def random_lon_lat(n, lon_range=(-180, 180), lat_range=(-90, 90), seed=42):
+    rnd = random.Random(seed)
+    lon = np.array([rnd.uniform(*lon_range) for _ in range(n)])
+    lat = np.array([rnd.uniform(*lat_range) for _ in range(n)])
+    return lon, lat
+
+
+def random_labellings(n, k1, k2, seed=42):
+    rnd = random.Random(seed)
+    labels_true = [rnd.randint(0, k1 - 1) for _ in range(n)]
+    labels_pred = [(label * 3 + 1) % k2 if rnd.random() < 0.7 else rnd.randint(0, k2 - 1) for label in labels_true]
+    return np.array(labels_true), np.array(labels_pred)
+
+
+def random_mixed_frame(n, seed=42):
+    rnd = np.random.RandomState(seed)
+    return pd.DataFrame({
+        'small_int': rnd.randint(-100, 100, n),
+        'big_int': rnd.randint(0, 70000, n),
+        'quarters': rnd.randint(0, 100, n) / 4.0,
+        'with_nan': np.where(np.arange(n) < n - 5, 1.0, np.nan),
+        'label': rnd.choice(['red', 'green', 'blue'], n),
+        'name': ['name_{}'.format(i) for i in range(n)],
+        'flag': rnd.rand(n) > 0.5,
+    })
+
+
+def random_interval_arrays(n, **kwargs):
+    intervals = random_intervals(n, **kwargs)
+    return (np.array([interval[0] for interval in intervals], dtype='datetime64[ns]'),
+            np.array([interval[1] for interval in intervals], dtype='datetime64[ns]'))
@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+HEAVY_MODULES = ['pandas', 'scipy', 'sklearn', 'matplotlib', 'plotly']
+# Generous budget for a cold interpreter importing the module, numpy included
+IMPORT_BUDGET_SECONDS = 2.0
+
+SCRIPT = """
+import json, sys, time
+start = time.time()
+import {module}
+elapsed = time.time() - start
+print(json.dumps({{'seconds': elapsed, 'modules': sorted(set(m.split('.')[0] for m in sys.modules))}}))
+"""
+
+
+def import_in_subprocess(module):
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    output = subprocess.check_output([sys.executable, '-c', SCRIPT.format(module=module)], cwd=ROOT, env=env)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+class ImportTimeTest(unittest.TestCase):
+    def check_module(self, module, allowed=()):
+        result = import_in_subprocess(module)
+        loaded = [m for m in HEAVY_MODULES if m in result['modules'] and m not in allowed]
+        self.assertEqual(loaded, [], "{} imports {}".format(module, loaded))
+        self.assertLess(result['seconds'], IMPORT_BUDGET_SECONDS)
+
+    def test_generic(self):
+        self.check_module('giammis.utils.generic')
+        pass
+
+    def test_gdatetime(self):
+        self.check_module('giammis.utils.gdatetime')
+        pass
+
+    def test_gmath(self):
+        self.check_module('giammis.utils.gmath')
+        pass
+
+    def test_gpandas(self):
+        self.check_module('giammis.utils.gpandas', allowed=['pandas'])
+        pass
+
+    def test_visualization(self):
+        self.check_module('giammis.utils.visualization')
+        pass
+
+    def test_surveymatrix(self):
+        self.check_module('giammis.survey.surveymatrix')
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()